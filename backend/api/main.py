@@ -1,13 +1,14 @@
 import asyncio
 import json
 import time
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from backend.core_math.telemetry import TelemetryEngine
 from backend.core_math.realtime_checker import RealTimeATC
 import math
 from pydantic import BaseModel
 from backend.core_math.offline_checker import OfflineBatchChecker
+from backend.core_math.conflict_cache import ConflictCache
 from backend.core_math.physics_proof import PhysicsProofEngine
 import io
 import contextlib
@@ -33,20 +34,40 @@ from backend.atc.manager import ATCManager
 from backend.simulators.bogie_generator import BogieGenerator
 from backend.simulators.controlled_generator import ControlledGenerator
 import random
+from collections import Counter
 
 atc_manager = ATCManager()
 
+def track_bogie(drone_id: str, data: dict):
+    """Keeps the ATC's bogie picture current so flight-plan proposals see extrapolated bogie tracks."""
+    if data.get("type") == "bogie":
+        atc_manager.update_bogie(drone_id, {"x": data["x"], "y": data["y"], "z": data["z"]},
+                                 {"vx": data.get("vx", 0.0), "vy": data.get("vy", 0.0), "vz": data.get("vz", 0.0)})
+
 def handle_telemetry(drone_id: str, data: dict):
+    # Gated on arrival; the engine applies queued packets in micro-batches
     if is_playing:
-        telemetry_engine.ingest_telemetry(drone_id, data)
+        telemetry_engine.enqueue_telemetry(drone_id, data)
+        track_bogie(drone_id, data)
     
 def handle_staged_telemetry(drone_id: str, data: dict):
     """Always-on telemetry for staged (unmoving) drones - bypasses is_playing gate."""
-    telemetry_engine.ingest_telemetry(drone_id, data)
+    telemetry_engine.enqueue_telemetry(drone_id, data)
+    track_bogie(drone_id, data)
 
 bogie_sim = BogieGenerator(handle_telemetry, staged_callback=handle_staged_telemetry)
 controlled_sim = ControlledGenerator(handle_telemetry)
 
+def retire_controlled(drone_id: str):
+    """A landed controlled drone releases its airspace intent and leaves the live state table."""
+    atc_manager.complete_flight(drone_id)
+    telemetry_engine.remove_drone(drone_id)
+
+controlled_sim.on_complete = retire_controlled
+# Timed-out bogies lose their track; any dropped track stops being extrapolated as a bogie future
+atc_manager.on_bogie_timeout = telemetry_engine.remove_drone
+telemetry_engine.on_remove = atc_manager.remove_bogie
+
 class BogieSpawnData(BaseModel):
     id: str
     x: float
@@ -111,13 +132,10 @@ def broadcast_staged():
 def clear_mode3():
     global is_playing
     is_playing = False   # Auto-pause simulation on reset
-    atc_manager.active_controlled.clear()
-    atc_manager.pending_clearance.clear()
-    atc_manager.active_uncontrolled.clear()
+    atc_manager.clear()
     controlled_sim.drones.clear()
     bogie_sim.drones.clear()
-    telemetry_engine.rolling_buffers.clear()
-    telemetry_engine.bogie_estimators.clear()
+    telemetry_engine.reset()
     return {"status": "success", "is_playing": False}
 
 @app.post("/api/mode3/pause")
@@ -136,32 +154,28 @@ def toggle_sim():
     is_playing = not is_playing
     return {"status": "success", "playing": is_playing}
 
+# Mode 1 results shared across requests: resubmitted missions only re-check the drones that changed
+MODE1_CACHE = ConflictCache()
+
 def format_segments(checker: OfflineBatchChecker):
-    return [{
-        "drone_id": s["drone_id"],
-        "A0": s["A0"].tolist(),
-        "A1": s["A1"].tolist(),
-        "velocity": s["velocity"].tolist() if isinstance(s["velocity"], np.ndarray) else s["velocity"],
-        "t_start": s["t_start"],
-        "t_end": s["t_end"]
-    } for s in checker.segments]
+    return checker.table.to_json()
 
 @app.post("/api/mode1/run")
 def run_mode1(data: dict = None):
     # Increased safety separation radius to 35m to make conflict detection much more robust
     # against human-generated "near-miss" waypoint datasets.
-    checker = OfflineBatchChecker(safety_radius=35.0) 
+    checker = OfflineBatchChecker(safety_radius=35.0, cache=MODE1_CACHE)
     if data is None or len(data) == 0:
         pass # Handle natively in frontend now
     else:
         checker.parse_mission_data(data)
         
     conflicts = checker.detect_conflicts()
-    return {"status": "success", "report": conflicts, "segments": format_segments(checker)}
+    return {"status": "success", "report": conflicts, "segments": format_segments(checker), "stats": checker.last_stats}
 
 @app.post("/api/mode1/resolve")
 def resolve_mode1(data: dict):
-    checker = OfflineBatchChecker(safety_radius=35.0) 
+    checker = OfflineBatchChecker(safety_radius=35.0, cache=MODE1_CACHE)
     checker.parse_mission_data(data)
     resolutions = checker.auto_resolve_time_shift()
     conflicts = checker.detect_conflicts()
@@ -169,7 +183,7 @@ def resolve_mode1(data: dict):
 
 @app.post("/api/mode1/resolve_spatial")
 def resolve_mode1_spatial(data: dict):
-    checker = OfflineBatchChecker(safety_radius=35.0) 
+    checker = OfflineBatchChecker(safety_radius=35.0, cache=MODE1_CACHE)
     checker.parse_mission_data(data)
     resolutions = checker.auto_resolve_spatial()
     conflicts = checker.detect_conflicts()
@@ -198,6 +212,38 @@ def propose_flight(data: dict):
     plan = data.get("plan", {})
     return atc_manager.propose_flight_plan(drone_id, plan)
 
+def batch_drone_ids(entries: list) -> list:
+    """
+    Drone ids of a proposal batch, in order. Entries without an id get the first free
+    Controlled_<n> (n counting from the entry's 1-based index) that is not pending, launched or
+    named elsewhere in the batch. Duplicate ids are rejected, as one result per id could not say
+    which plan it answers.
+    """
+    given = Counter(p["drone_id"] for p in entries if "drone_id" in p)
+    duplicates = sorted(d for d, count in given.items() if count > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate drone_id in batch: {', '.join(duplicates)}")
+    taken = set(given) | set(atc_manager.pending_clearance) | set(atc_manager.active_controlled)
+    ids = []
+    for i, p in enumerate(entries, start=1):
+        if "drone_id" in p:
+            ids.append(p["drone_id"])
+            continue
+        while f"Controlled_{i}" in taken:
+            i += 1
+        taken.add(f"Controlled_{i}")
+        ids.append(f"Controlled_{i}")
+    return ids
+
+@app.post("/api/mode3/propose_batch")
+def propose_flights(data: dict):
+    # Expects {"plans": [{"drone_id": "ID", "plan": {...}}, ...], "auto_delay": false}
+    entries = data.get("plans", [])
+    plans = {d: p.get("plan", {}) for d, p in zip(batch_drone_ids(entries), entries)}
+    results = atc_manager.propose_batch(plans, auto_delay=data.get("auto_delay", False))
+    approved = sum(r["status"] == "APPROVED" for r in results.values())
+    return {"status": "success", "approved": approved, "rejected": len(results) - approved, "results": results}
+
 @app.post("/api/mode3/launch")
 def launch_flight(drone_id: str):
     if atc_manager.launch_flight(drone_id):
@@ -219,19 +265,20 @@ async def websocket_endpoint(websocket: WebSocket):
 async def broadcast_telemetry():
     while True:
         # Always broadcast - is_playing only gates physics/movement, not visibility
-        states = telemetry_engine.get_latest_state()
-        if states and active_connections:
+        with telemetry_engine.lock:
+            records = telemetry_engine.state_view().records()
+        if records and active_connections:
             t0 = time.time()
             conflicts = atc_math.monitor_airspace() if is_playing else []
             conflict_check_ms = round((time.time() - t0) * 1000, 1)
 
             message = json.dumps({
                 "type": "telemetry", 
-                "data": list(states.values()),
+                "data": records,
                 "conflicts": conflicts,
                 "flight_plans": [],
                 "conflict_check_ms": conflict_check_ms,
-                "drone_count": len(states),
+                "drone_count": len(records),
                 "paused_drones": controlled_sim.get_paused_status()
             })
             for connection in active_connections[:]:
@@ -244,6 +291,7 @@ async def broadcast_telemetry():
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(broadcast_telemetry())
+    asyncio.create_task(telemetry_engine.drain_loop())
     asyncio.create_task(bogie_sim.simulate_loop())
     asyncio.create_task(controlled_sim.simulate_loop())
     
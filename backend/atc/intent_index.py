@@ -0,0 +1,227 @@
+import numpy as np
+from ..core_math.offline_checker import OfflineBatchChecker, shifted_legs
+from ..core_math.departure_solver import forbidden_delay_intervals, earliest_safe_delay
+from ..spatial.rtree_filter import SpatialTemporalIndex
+
+class IntentIndex:
+    """
+    Persistent 4D (x, y, z, t) index of approved flight intents, for strategic deconfliction.
+
+    Every leg of an intent owns one slot in a set of leg columns and one box in a dynamic R-tree
+    (box id == slot), so adding, re-timing or dropping an intent only touches that intent's boxes,
+    and checking a proposal costs one index query plus a vectorised narrow phase.
+    Boxes use the same half-separation padding as the offline checker.
+    """
+    _COLUMNS = (("_A0", (3,), float), ("_A1", (3,), float), ("_velocity", (3,), float),
+                ("_t_start", (), float), ("_t_end", (), float), ("_owner", (), np.int64),
+                ("_mins", (4,), float), ("_maxs", (4,), float))
+
+    def __init__(self, safety_radius: float = 35.0, vertical_safety_radius: float = 15.0, capacity: int = 256):
+        # Narrow-phase engine: the Mode 1 dual-cylinder test with the same separation minima
+        self.checker = OfflineBatchChecker(safety_radius, vertical_safety_radius)
+        self.index = SpatialTemporalIndex(safety_radius)
+        for name, shape, dtype in self._COLUMNS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        self._owner[:] = -1
+        self._free = list(range(capacity - 1, -1, -1))
+
+        # Owner lookup: integer id <-> drone id (append-only), plus each intent's slots
+        self.drone_ids = []
+        self.drone_index = {}
+        self.slots = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, drone_id: str):
+        return drone_id in self.slots
+
+    def _allocate(self, k: int) -> np.ndarray:
+        if len(self._free) < k:
+            capacity = len(self._t_start)
+            new_capacity = max(2 * capacity, capacity + k)
+            for name, shape, dtype in self._COLUMNS:
+                old = getattr(self, name)
+                new = np.zeros((new_capacity,) + shape, dtype=dtype)
+                new[:capacity] = old
+                setattr(self, name, new)
+            self._owner[capacity:] = -1
+            self._free = list(range(new_capacity - 1, capacity - 1, -1)) + self._free
+        return np.array([self._free.pop() for _ in range(k)], dtype=np.int64)
+
+    def add(self, drone_id: str, legs: dict):
+        """Indexes (or replaces) a drone's intent, given as a drone_legs()-style dict."""
+        self.remove(drone_id)
+        k = len(legs["t_start"])
+        if k == 0:
+            return
+        d = self.drone_index.get(drone_id)
+        if d is None:
+            d = len(self.drone_ids)
+            self.drone_ids.append(drone_id)
+            self.drone_index[drone_id] = d
+
+        slots = self._allocate(k)
+        mins, maxs = self.checker.leg_boxes(legs["A0"], legs["A1"], legs["t_start"], legs["t_end"])
+        self._A0[slots] = legs["A0"]
+        self._A1[slots] = legs["A1"]
+        self._velocity[slots] = legs["velocity"]
+        self._t_start[slots] = legs["t_start"]
+        self._t_end[slots] = legs["t_end"]
+        self._owner[slots] = d
+        self._mins[slots] = mins
+        self._maxs[slots] = maxs
+        self.index.insert_boxes(slots, mins, maxs)
+        self.slots[drone_id] = slots
+
+    def remove(self, drone_id: str):
+        """Drops a drone's intent (no-op if it has none)."""
+        slots = self.slots.pop(drone_id, None)
+        if slots is None:
+            return
+        self.index.delete_boxes(slots, self._mins[slots], self._maxs[slots])
+        self._owner[slots] = -1
+        self._free.extend(slots.tolist())
+
+    def legs(self, drone_id: str) -> dict:
+        """Copy of a drone's indexed legs."""
+        slots = self.slots[drone_id]
+        return {
+            "A0": self._A0[slots], "A1": self._A1[slots], "velocity": self._velocity[slots],
+            "t_start": self._t_start[slots], "t_end": self._t_end[slots]
+        }
+
+    def shift(self, drone_id: str, delay: float):
+        """Re-times a drone's intent by `delay` seconds (e.g. actual vs requested departure)."""
+        if drone_id in self.slots and delay != 0:
+            self.add(drone_id, shifted_legs(self.legs(drone_id), delay))
+
+    def clear(self):
+        for drone_id in list(self.slots):
+            self.remove(drone_id)
+
+    def _candidates(self, legs: dict, own: np.ndarray, extra: dict, max_delay: float = 0.0) -> tuple:
+        """
+        Candidate leg pairs of proposed legs against the indexed intents and the legs of `extra`,
+        with the proposal's boxes stretched over `max_delay`. Proposed leg k skips intent slots
+        of owner own[k] (its drone's current intent, which the proposal would replace).
+        Returns (query, B columns, owner, names): query[i] is the proposed leg of pair i and
+        owner[i] indexes `names` (intent owners, then `extra` ids) for the other side.
+        """
+        mins, maxs = self.checker.leg_boxes(legs["A0"], legs["A1"], legs["t_start"], legs["t_end"])
+        maxs[:, 3] += max_delay
+        query, slots = self.index.query_boxes(mins, maxs)
+        keep = self._owner[slots] != own[query]
+        query, slots = query[keep], slots[keep]
+
+        queries = [query]
+        columns = [[self._A0[slots]], [self._velocity[slots]], [self._t_start[slots]], [self._t_end[slots]]]
+        owners = [self._owner[slots]]
+        names = list(self.drone_ids)
+        if extra:
+            # Transient traffic (e.g. bogie tracks) changes every tick: bulk-load it per check instead
+            counts = [len(other["t_start"]) for other in extra.values()]
+            other = {key: np.concatenate([o[key] for o in extra.values()]) for key in ("A0", "A1", "velocity", "t_start", "t_end")}
+            other_owner = len(names) + np.repeat(np.arange(len(extra)), counts)
+            o_mins, o_maxs = self.checker.leg_boxes(other["A0"], other["A1"], other["t_start"], other["t_end"])
+            query, rows = SpatialTemporalIndex.from_boxes(o_mins, o_maxs, other_owner).query_boxes(mins, maxs)
+            queries.append(query)
+            for col, key in zip(columns, ("A0", "velocity", "t_start", "t_end")):
+                col.append(other[key][rows])
+            owners.append(other_owner[rows])
+            names += list(extra)
+        return (np.concatenate(queries), [np.concatenate(c) for c in columns], np.concatenate(owners), names)
+
+    @staticmethod
+    def _stack(plans: dict) -> tuple:
+        """Concatenates {drone_id: legs} into one legs dict plus each leg's position in `plans`."""
+        counts = [len(legs["t_start"]) for legs in plans.values()]
+        stacked = {key: np.concatenate([legs[key] for legs in plans.values()])
+                   for key in ("A0", "A1", "velocity", "t_start", "t_end")}
+        return stacked, np.repeat(np.arange(len(plans)), counts)
+
+    def check(self, drone_id: str, legs: dict, extra: dict = None, max_delay: float = 600.0) -> tuple:
+        """
+        Checks a proposed intent against every indexed intent and the legs of `extra`
+        ({drone_id: legs}, e.g. extrapolated bogie tracks), without indexing it.
+        Returns (conflicts, suggested_delay): Mode 1 style conflict dicts with the proposal as
+        Drone_A, and, if there are any, the smallest departure delay up to `max_delay` that
+        clears them all (None if none does).
+        """
+        return self.check_many({drone_id: legs}, extra, max_delay)[drone_id]
+
+    def check_many(self, plans: dict, extra: dict = None, max_delay: float = 600.0) -> dict:
+        """
+        check() for many independent proposals ({drone_id: legs}) in one stacked pass. Each is
+        checked against existing traffic only, not against the others.
+        Returns {drone_id: (conflicts, suggested_delay)}.
+        """
+        ids = list(plans)
+        if not ids:
+            return {}
+        extra = extra or {}
+        legs, batch = self._stack(plans)
+        own = np.array([self.drone_index.get(d, -1) for d in ids], dtype=np.int64)[batch]
+        query, (A0, vel, t0, t1), owner, names = self._candidates(legs, own, extra)
+        first = len(names)
+        names += ids
+        conflicts = self.checker._narrow_phase(
+            legs["A0"][query], legs["velocity"][query], legs["t_start"][query], legs["t_end"][query],
+            first + batch[query],
+            A0, vel, t0, t1, owner, ids=names
+        )
+        results = {d: ([], 0.0) for d in ids}
+        for c in conflicts:
+            results[c["Drone_A"]][0].append(c)
+        rejected = np.array([bool(results[d][0]) for d in ids])
+        if not rejected.any():
+            return results
+
+        # Suggested delays: every rejected proposal's forbidden-delay intervals in one solve
+        sel = np.flatnonzero(rejected[batch])
+        sub = {key: col[sel] for key, col in legs.items()}
+        query, (A0, vel, t0, t1), _, _ = self._candidates(sub, own[sel], extra, max_delay)
+        lo, hi, valid = forbidden_delay_intervals(
+            sub["A0"][query], sub["velocity"][query], sub["t_start"][query], sub["t_end"][query],
+            A0, vel, t0, t1, self.checker.safety_radius, self.checker.vertical_safety_radius
+        )
+        p = batch[sel][query][valid]
+        lo, hi = lo[valid], hi[valid]
+        for i in np.flatnonzero(rejected).tolist():
+            mine = p == i
+            delay = earliest_safe_delay(lo[mine], hi[mine])
+            results[ids[i]] = (results[ids[i]][0], delay if delay <= max_delay else None)
+        return results
+
+    def check_batch(self, plans: dict, extra: dict = None) -> tuple:
+        """
+        Screens many proposed intents ({drone_id: legs}) in one pass: a single stacked query against
+        the indexed intents and `extra`, and one self-join among the proposals themselves.
+        Returns (blocked, pairs): blocked[p] is True where proposal p (in `plans` order) conflicts
+        with existing traffic; pairs is a (K, 2) array of proposals p < q that conflict with each other.
+        """
+        ids = list(plans)
+        if not ids:
+            return np.zeros(0, dtype=bool), np.empty((0, 2), dtype=np.int64)
+        legs, batch = self._stack(plans)
+        own = np.array([self.drone_index.get(d, -1) for d in ids], dtype=np.int64)[batch]
+
+        # 1. Every proposed leg against existing traffic
+        query, (A0, vel, t0, t1), _, _ = self._candidates(legs, own, extra or {})
+        hits = self.checker._narrow_phase_hits(
+            legs["A0"][query], legs["velocity"][query], legs["t_start"][query], legs["t_end"][query],
+            A0, vel, t0, t1
+        )[0]
+        blocked = np.zeros(len(ids), dtype=bool)
+        blocked[batch[query[hits]]] = True
+
+        # 2. Proposals against each other: bulk-load them and self-join
+        mins, maxs = self.checker.leg_boxes(legs["A0"], legs["A1"], legs["t_start"], legs["t_end"])
+        pairs = SpatialTemporalIndex.from_boxes(mins, maxs, batch).self_join()
+        a, b = pairs[:, 0], pairs[:, 1]
+        hits = self.checker._narrow_phase_hits(
+            legs["A0"][a], legs["velocity"][a], legs["t_start"][a], legs["t_end"][a],
+            legs["A0"][b], legs["velocity"][b], legs["t_start"][b], legs["t_end"][b]
+        )[0]
+        pairs = np.unique(np.sort(batch[pairs[hits]], axis=1), axis=0).reshape(-1, 2)
+        return blocked, pairs
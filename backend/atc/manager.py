@@ -1,5 +1,8 @@
 import time
+import numpy as np
 from typing import Dict, List, Any
+from .intent_index import IntentIndex
+from ..core_math.offline_checker import waypoint_legs, shifted_legs
 
 class ATCManager:
     """
@@ -9,7 +12,8 @@ class ATCManager:
     2. active_uncontrolled: Bogies/Rogue drones (only have telemetry history, unpredictable futures)
     3. pending_clearance: Flight plans approved but not yet launched
     """
-    def __init__(self):
+    def __init__(self, safety_radius: float = 35.0, vertical_safety_radius: float = 15.0,
+                 bogie_horizon: float = 60.0, max_delay: float = 600.0):
         # Drone_ID -> { waypoints, velocity, t_start, segments, paused }
         self.active_controlled: Dict[str, Any] = {}
         
@@ -19,22 +23,137 @@ class ATCManager:
         # Drone_ID -> { waypoints, velocity, requested_t_start, segments }
         self.pending_clearance: Dict[str, Any] = {}
         
+        # 4D intents of every pending and active controlled flight, kept in step with the two dicts
+        self.intents = IntentIndex(safety_radius, vertical_safety_radius)
+        
+        # Bogies have no plan: their futures are straight-line extrapolations over this horizon (s)
+        self.bogie_horizon = bogie_horizon
+        self.max_delay = max_delay
+        
+        # Optional hook called with the bogie id when a silent bogie times out (e.g. to drop its track)
+        self.on_bogie_timeout = None
+        
+    def plan_legs(self, plan: Dict[str, Any], start_time: float) -> dict:
+        """Constant-velocity legs of a flight plan departing at `start_time` (absolute, s)."""
+        wps = np.array([[w["x"], w["y"], w.get("z", 50.0)] for w in plan.get("waypoints", [])], dtype=float)
+        if len(wps) < 2:
+            return {"A0": np.empty((0, 3)), "A1": np.empty((0, 3)), "velocity": np.empty((0, 3)),
+                    "t_start": np.empty(0), "t_end": np.empty(0)}
+        # Same default speed the controlled simulator flies at
+        return waypoint_legs(wps, start_time, velocity=plan.get("velocity", 10))
+        
+    def bogie_futures(self, now: float) -> dict:
+        """
+        Extrapolated track of every bogie from `now` over the bogie horizon: {bogie_id: legs}.
+        Bogies silent for longer than the horizon are dropped rather than extrapolated indefinitely.
+        """
+        stale = [b for b, bogie in self.active_uncontrolled.items() if now - bogie["last_seen"] > self.bogie_horizon]
+        for bogie_id in stale:
+            self.remove_bogie(bogie_id)
+            if self.on_bogie_timeout:
+                self.on_bogie_timeout(bogie_id)
+        futures = {}
+        for bogie_id, bogie in self.active_uncontrolled.items():
+            p = bogie["current_pos"]
+            v = bogie["estimated_velocity"]
+            vel = np.array([[v["vx"], v["vy"], v["vz"]]], dtype=float)
+            A0 = np.array([[p["x"], p["y"], p.get("z", 0.0)]], dtype=float) + vel * max(0.0, now - bogie["last_seen"])
+            futures[bogie_id] = {
+                "A0": A0, "A1": A0 + vel * self.bogie_horizon, "velocity": vel,
+                "t_start": np.array([now]), "t_end": np.array([now + self.bogie_horizon])
+            }
+        return futures
+        
     def propose_flight_plan(self, drone_id: str, plan: Dict[str, Any]) -> Dict[str, Any]:
         """
         Evaluate a submitted flight plan against:
         - currently flying drones (extrapolated futures)
         - approved-but-not-launched flights
+        The plan departs at plan["start_time"] (absolute, default now). Approved plans join the
+        pending queue and the intent index; rejected ones come back with their conflicts and
+        the smallest departure delay that would clear them (None if none within max_delay).
+        """
+        now = time.time()
+        start_time = float(plan.get("start_time", now))
+        legs = self.plan_legs(plan, start_time)
+        conflicts, delay = self.intents.check(drone_id, legs, self.bogie_futures(now), self.max_delay)
+        if conflicts:
+            return self._rejection(conflicts, delay)
+        return self._approve(drone_id, plan, legs, start_time)
+        
+    def propose_batch(self, plans: Dict[str, Dict[str, Any]], auto_delay: bool = False) -> Dict[str, Any]:
+        """
+        Evaluates many flight plans ({drone_id: plan}) in one pass: all of them are screened against
+        existing traffic with one stacked index query and against each other with one self-join.
+        Plans are then granted first-come-first-served in submission order: a plan is approved if
+        it is clear of existing traffic and of every plan approved before it in the batch.
+        The others are rejected with their conflicts and suggested delay, or, with `auto_delay`,
+        approved at that delay when one exists. Returns {drone_id: result} as propose_flight_plan.
         """
-        # TODO: Implement pre-flight collision check (Mode 1 logic re-used over future horizon)
+        now = time.time()
+        starts = {d: float(p.get("start_time", now)) for d, p in plans.items()}
+        legs = {d: self.plan_legs(p, starts[d]) for d, p in plans.items()}
+        futures = self.bogie_futures(now)
+        results = {}
         
-        # For now, auto-approve everything into the pending queue
+        # 1. Undelayed plans, then (auto_delay) each round's delayed plans, granted greedily in order
+        candidates = legs
+        delays = {d: 0.0 for d in plans}
+        while candidates:
+            blocked, pairs = self.intents.check_batch(candidates, futures)
+            granted = self._grant_in_order(blocked, pairs)
+            ids = list(candidates)
+            for p in np.flatnonzero(granted).tolist():
+                d = ids[p]
+                results[d] = self._approve(d, plans[d], candidates[d], starts[d] + delays[d])
+                if delays[d]:
+                    results[d]["delay"] = delays[d]
+                    results[d]["message"] = f"Flight plan accepted with a {delays[d]:.1f} s departure delay."
+                    
+            # 2. Everything else against all approvals so far, with its suggested delay
+            rest = [ids[p] for p in np.flatnonzero(~granted).tolist()]
+            checked = self.intents.check_many({d: legs[d] for d in rest}, futures, self.max_delay)
+            candidates = {}
+            for p, d in zip(np.flatnonzero(~granted).tolist(), rest):
+                conflicts, delay = checked[d]
+                # A delayed plan still blocked by existing traffic would get the same delay again
+                if auto_delay and delay is not None and not (delays[d] and blocked[p]):
+                    delays[d] = delay
+                    candidates[d] = shifted_legs(legs[d], delay)
+                else:
+                    results[d] = self._rejection(conflicts, delay)
+        return {d: results[d] for d in plans}
+        
+    @staticmethod
+    def _grant_in_order(blocked: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+        """Greedy first-come-first-served grant over a batch's conflict pairs."""
+        partners = {}
+        for p, q in pairs.tolist():
+            partners.setdefault(p, []).append(q)
+            partners.setdefault(q, []).append(p)
+        granted = np.zeros(len(blocked), dtype=bool)
+        for p in range(len(blocked)):
+            granted[p] = not blocked[p] and not any(granted[q] for q in partners.get(p, ()))
+        return granted
+        
+    def _approve(self, drone_id: str, plan: Dict[str, Any], legs: dict, start_time: float) -> Dict[str, Any]:
+        plan["requested_t_start"] = start_time
         self.pending_clearance[drone_id] = plan
+        self.intents.add(drone_id, legs)
         return {
             "status": "APPROVED",
-            "message": "Flight plan logically accepted into pending queue.",
+            "message": "Flight plan deconflicted and accepted into pending queue.",
             "conflicts": []
         }
         
+    def _rejection(self, conflicts: list, delay: float) -> Dict[str, Any]:
+        return {
+            "status": "REJECTED",
+            "message": f"Flight plan conflicts with {len({c['Drone_B'] for c in conflicts})} other flight(s).",
+            "conflicts": conflicts,
+            "suggested_delay": delay
+        }
+        
     def launch_flight(self, drone_id: str):
         """Moves a flight from pending_clearance to active_controlled"""
         if drone_id in self.pending_clearance:
@@ -42,9 +161,24 @@ class ATCManager:
             plan['t_start'] = time.time()
             plan['paused'] = False
             self.active_controlled[drone_id] = plan
+            # The intent was approved for the requested departure: re-time it to the actual one
+            self.intents.shift(drone_id, plan['t_start'] - plan.get('requested_t_start', plan['t_start']))
             return True
         return False
         
+    def complete_flight(self, drone_id: str):
+        """Retires a landed (or cancelled) flight and frees its airspace intent"""
+        self.active_controlled.pop(drone_id, None)
+        self.pending_clearance.pop(drone_id, None)
+        self.intents.remove(drone_id)
+        
+    def clear(self):
+        """Drops all traffic and intents"""
+        self.active_controlled.clear()
+        self.pending_clearance.clear()
+        self.active_uncontrolled.clear()
+        self.intents.clear()
+        
     def register_bogie(self, bogie_id: str, pos: Dict[str, float]):
         """Registers a new uncooperative drone from raw telemetry"""
         if bogie_id not in self.active_uncontrolled:
@@ -55,12 +189,28 @@ class ATCManager:
                 "last_seen": time.time()
             }
             
+    def update_bogie(self, bogie_id: str, pos: Dict[str, float], velocity: Dict[str, float]):
+        """Refreshes a bogie's last known position and velocity estimate"""
+        self.register_bogie(bogie_id, pos)
+        bogie = self.active_uncontrolled[bogie_id]
+        bogie["current_pos"] = pos
+        bogie["estimated_velocity"] = velocity
+        bogie["last_seen"] = time.time()
+            
+    def remove_bogie(self, bogie_id: str):
+        """Forgets a bogie whose track was dropped (no-op for unknown ids)"""
+        self.active_uncontrolled.pop(bogie_id, None)
+            
     def pause_drone(self, drone_id: str):
         """Issues a hold command to a controlled drone"""
-        if drone_id in self.active_controlled:
+        if drone_id in self.active_controlled and not self.active_controlled[drone_id]['paused']:
             self.active_controlled[drone_id]['paused'] = True
+            self.active_controlled[drone_id]['paused_at'] = time.time()
             
     def resume_drone(self, drone_id: str):
         """Resumes a held controlled drone"""
-        if drone_id in self.active_controlled:
-            self.active_controlled[drone_id]['paused'] = False
+        if drone_id in self.active_controlled and self.active_controlled[drone_id]['paused']:
+            plan = self.active_controlled[drone_id]
+            plan['paused'] = False
+            # The rest of the flight now happens that much later
+            self.intents.shift(drone_id, time.time() - plan.pop('paused_at', time.time()))
@@ -0,0 +1,117 @@
+import json
+import os
+import numpy as np
+from .segment_table import SegmentTable
+
+# On-disk columnar format: a directory holding one .npy file per column plus a small JSON
+# header (format tag, drone id list). Columns are memory-mapped on load, so opening a
+# stored mission or report costs no parsing and pages data in only as it is touched.
+FORMAT_VERSION = 1
+TABLE_COLUMNS = ("A0", "A1", "velocity", "t_start", "t_end", "drone_idx")
+SEVERITY_CODES = ("WARNING", "CRITICAL")
+
+def is_columnar(path: str) -> bool:
+    """Columnar stores are directories holding a header.json; anything else is read as JSON."""
+    return os.path.isfile(os.path.join(path, "header.json"))
+
+def _write_header(path: str, kind: str, drone_ids: list):
+    with open(os.path.join(path, "header.json"), "w") as f:
+        json.dump({"format": kind, "version": FORMAT_VERSION, "drone_ids": drone_ids}, f)
+
+def _read_header(path: str, kind: str) -> dict:
+    with open(os.path.join(path, "header.json"), "r") as f:
+        header = json.load(f)
+    if header.get("format") != kind or header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} '{kind}' store")
+    return header
+
+def save_table(table: SegmentTable, path: str):
+    """Writes a segment table as memory-mappable columns."""
+    os.makedirs(path, exist_ok=True)
+    for name, col in table.columns().items():
+        np.save(os.path.join(path, f"{name}.npy"), col)
+    _write_header(path, "segments", table.drone_ids)
+
+def load_table(path: str, mmap: bool = True) -> SegmentTable:
+    """
+    Opens a stored segment table. With `mmap`, columns are mapped copy-on-write: in-place edits
+    (shifts, re-plans) stay private to this process and the file on disk is never modified.
+    """
+    header = _read_header(path, "segments")
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c" if mmap else None)
+               for name in TABLE_COLUMNS}
+    return SegmentTable.from_columns(columns, header["drone_ids"])
+
+def save_report(conflicts: list, path: str):
+    """Writes a conflict report (detect_conflicts() output) as columns."""
+    os.makedirs(path, exist_ok=True)
+    drone_ids = sorted({c["Drone_A"] for c in conflicts} | {c["Drone_B"] for c in conflicts})
+    code = {d: i for i, d in enumerate(drone_ids)}
+    columns = {
+        "drone_a": np.array([code[c["Drone_A"]] for c in conflicts], dtype=np.int32),
+        "drone_b": np.array([code[c["Drone_B"]] for c in conflicts], dtype=np.int32),
+        "exact_conflict_time": np.array([c["exact_conflict_time"] for c in conflicts], dtype=float),
+        "conflict_location": np.array([c["conflict_location"] for c in conflicts], dtype=float).reshape(-1, 3),
+        "minimum_separation": np.array([c["minimum_separation"] for c in conflicts], dtype=float),
+        "severity": np.array([SEVERITY_CODES.index(c["severity"]) for c in conflicts], dtype=np.int8),
+        "los_entry_time": np.array([c.get("los_entry_time", np.nan) for c in conflicts], dtype=float),
+        "los_exit_time": np.array([c.get("los_exit_time", np.nan) for c in conflicts], dtype=float)
+    }
+    for name, col in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), col)
+    _write_header(path, "report", drone_ids)
+
+def load_report_columns(path: str, mmap: bool = True) -> tuple:
+    """Returns (columns, drone_ids) of a stored report without building per-conflict dicts."""
+    header = _read_header(path, "report")
+    names = ("drone_a", "drone_b", "exact_conflict_time", "conflict_location", "minimum_separation", "severity",
+             "los_entry_time", "los_exit_time")
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None) for name in names}
+    return columns, header["drone_ids"]
+
+def load_report(path: str) -> list:
+    """Rebuilds the JSON report schema (list of conflict dicts) from a stored report."""
+    columns, ids = load_report_columns(path, mmap=False)
+    return [{
+        "Drone_A": ids[a],
+        "Drone_B": ids[b],
+        "exact_conflict_time": t,
+        "conflict_location": loc,
+        "minimum_separation": sep,
+        "severity": SEVERITY_CODES[s],
+        "los_entry_time": t_in,
+        "los_exit_time": t_out
+    } for a, b, t, loc, sep, s, t_in, t_out in zip(columns["drone_a"].tolist(), columns["drone_b"].tolist(),
+                                                   columns["exact_conflict_time"].tolist(), columns["conflict_location"].tolist(),
+                                                   columns["minimum_separation"].tolist(), columns["severity"].tolist(),
+                                                   columns["los_entry_time"].tolist(), columns["los_exit_time"].tolist())]
+
+def table_to_mission(table: SegmentTable) -> dict:
+    """
+    Converts a segment table back to the JSON mission schema. Each drone's legs become its
+    waypoint chain; start_time/end_time pin the schedule, so a parsed mission re-parses to the same legs.
+    """
+    mission = {}
+    for d, drone_id in enumerate(table.drone_ids):
+        start, stop = table._row_range[d]
+        if start == stop:
+            continue
+        points = np.vstack((table.A0[start:stop], table.A1[stop - 1:stop])).tolist()
+        mission[drone_id] = {
+            "waypoints": [{"x": x, "y": y, "z": z} for x, y, z in points],
+            "start_time": float(table.t_start[start]),
+            "end_time": float(table.t_end[stop - 1])
+        }
+    return mission
+
+def json_to_columnar(json_path: str, out_path: str):
+    """Converts a JSON/NDJSON mission file to a columnar segment store without loading the JSON tree."""
+    from .offline_checker import OfflineBatchChecker
+    checker = OfflineBatchChecker()
+    checker.stream_mission_file(json_path)
+    save_table(checker.table, out_path)
+
+def columnar_to_json(path: str, json_path: str):
+    """Converts a columnar segment store back to a JSON mission file."""
+    with open(json_path, "w") as f:
+        json.dump(table_to_mission(load_table(path)), f)
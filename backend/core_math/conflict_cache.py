@@ -0,0 +1,138 @@
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+
+class ConflictCache:
+    """
+    LRU cache of offline conflict results, shared across checker instances (e.g. Mode 1 requests).
+
+    Each drone is keyed by a content hash of its parsed legs, its id and the separation radii,
+    so a resubmitted drone with the same plan maps to the same key. For every pair of keys the
+    cache keeps the conflicting leg pairs (local leg indices), which is enough to regenerate the
+    exact report. Pairs without conflicts are not stored: instead every completed check records
+    a snapshot, the set of keys that were checked against each other, and a pair of keys that
+    share a snapshot with no stored hits is known to be clear.
+
+    Eviction is per drone key (least recently used), dropping its pair entries with it. At most
+    `max_snapshots` snapshots are kept (newest first), and a snapshot is dropped as soon as each of
+    its keys belongs to a newer one; keys left in no snapshot are evicted.
+    """
+    def __init__(self, max_drones: int = 50000, max_snapshots: int = 64):
+        self.max_drones = max_drones
+        self.max_snapshots = max_snapshots
+        self._drones = OrderedDict()     # key -> set of snapshot ids
+        self._snapshots = {}             # snapshot id -> set of keys
+        self._partners = {}              # key -> set of keys it has stored hits with
+        self._hits = {}                  # (key_x, key_y), key_x < key_y -> (k, 2) local leg pairs
+        self._next_snapshot = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._drones)
+
+    @staticmethod
+    def drone_keys(table, safety_radius: float, vertical_safety_radius: float) -> list:
+        """Content hash of every drone's legs in a SegmentTable (None for drones without legs)."""
+        keys = []
+        for d, drone_id in enumerate(table.drone_ids):
+            start, stop = table._row_range[d]
+            if start == stop:
+                keys.append(None)
+                continue
+            h = hashlib.blake2b(digest_size=16)
+            h.update(repr((drone_id, float(safety_radius), float(vertical_safety_radius))).encode())
+            for col in (table.A0, table.A1, table.velocity, table.t_start, table.t_end):
+                h.update(np.ascontiguousarray(col[start:stop]).tobytes())
+            keys.append(h.hexdigest())
+        return keys
+
+    def known_drones(self, keys: list) -> set:
+        """
+        Positions in `keys` whose mutual pairs are all answered by the cache: the drones of the
+        snapshot that covers the most of them. Every other drone has to be re-checked.
+        """
+        with self._lock:
+            votes = {}
+            for k in keys:
+                for s in self._drones.get(k, ()):
+                    votes[s] = votes.get(s, 0) + 1
+            if not votes:
+                return set()
+            best = self._snapshots[max(votes, key=votes.get)]
+            return {i for i, k in enumerate(keys) if k in best}
+
+    def known_hits(self, keys: list, known: set) -> list:
+        """Stored hits among the `known` drones as (i, j, leg pairs) with i, j positions in `keys`."""
+        with self._lock:
+            position = {keys[i]: i for i in known}
+            out = []
+            for i in known:
+                k = keys[i]
+                self._drones.move_to_end(k)
+                for other in self._partners.get(k, ()):
+                    j = position.get(other)
+                    if j is not None and k < other:
+                        out.append((i, j, self._hits[(k, other)]))
+            return out
+
+    def store(self, keys: list, hits: dict):
+        """
+        Records a completed check of all `keys` against each other.
+        `hits` maps (i, j) positions in `keys` to their (k, 2) conflicting local leg pairs.
+        """
+        with self._lock:
+            snapshot = next(self._next_snapshot)
+            members = {k for k in keys if k is not None}
+            older = set().union(*(self._drones.get(k, ()) for k in members))
+            self._snapshots[snapshot] = members
+            for k in members:
+                self._drones.setdefault(k, set()).add(snapshot)
+                self._drones.move_to_end(k)
+            # 1. Older snapshots whose every key now also belongs to a newer one are superseded
+            for s in older:
+                if all(max(self._drones[k]) > s for k in self._snapshots[s]):
+                    self._drop_snapshot(s)
+            # 2. Then the oldest snapshots beyond the cap (ids increase, dicts keep insertion order)
+            while len(self._snapshots) > self.max_snapshots:
+                self._drop_snapshot(next(iter(self._snapshots)))
+            for (i, j), legs in hits.items():
+                a, b = keys[i], keys[j]
+                if b < a:
+                    a, b, legs = b, a, legs[:, ::-1]
+                self._hits[(a, b)] = np.ascontiguousarray(legs)
+                self._partners.setdefault(a, set()).add(b)
+                self._partners.setdefault(b, set()).add(a)
+            while len(self._drones) > self.max_drones:
+                self._evict(next(iter(self._drones)))
+
+    def _drop_snapshot(self, snapshot: int):
+        """Forgets a snapshot; keys it leaves in no snapshot can no longer be answered and are evicted."""
+        for k in self._snapshots.pop(snapshot):
+            snapshots = self._drones[k]
+            snapshots.discard(snapshot)
+            if not snapshots:
+                self._evict(k)
+
+    def _evict(self, key):
+        snapshots = self._drones.pop(key)
+        for s in snapshots:
+            members = self._snapshots[s]
+            members.discard(key)
+            if not members:
+                del self._snapshots[s]
+        for other in self._partners.pop(key, ()):
+            self._hits.pop((min(key, other), max(key, other)), None)
+            partners = self._partners.get(other)
+            if partners is not None:
+                partners.discard(key)
+                if not partners:
+                    del self._partners[other]
+
+    def clear(self):
+        with self._lock:
+            self._drones.clear()
+            self._snapshots.clear()
+            self._partners.clear()
+            self._hits.clear()
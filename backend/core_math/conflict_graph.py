@@ -0,0 +1,37 @@
+import heapq
+
+def build_conflict_graph(conflicts: list) -> dict:
+    """Undirected drone-level conflict graph: Drone_ID -> set of conflicting Drone_IDs."""
+    graph = {}
+    for c in conflicts:
+        a, b = c["Drone_A"], c["Drone_B"]
+        graph.setdefault(a, set()).add(b)
+        graph.setdefault(b, set()).add(a)
+    return graph
+
+def greedy_vertex_cover(graph: dict, rank: dict = None) -> list:
+    """
+    Greedy vertex cover: repeatedly takes the drone touching the most uncovered conflicts.
+    Adjusting every returned drone (in the returned order) touches every conflict edge, while
+    drones outside the cover keep their plans. Ties go to the lower `rank` (default: name order).
+    """
+    rank = rank or {d: d for d in graph}
+    degree = {d: len(n) for d, n in graph.items()}
+    heap = [(-deg, rank[d], d) for d, deg in degree.items() if deg]
+    heapq.heapify(heap)
+    covered = set()
+    cover = []
+    while heap:
+        neg_deg, r, d = heapq.heappop(heap)
+        if d in covered or -neg_deg != degree[d]:
+            # Stale entry: re-queue with the current degree if it still has uncovered edges
+            if d not in covered and degree[d]:
+                heapq.heappush(heap, (-degree[d], r, d))
+            continue
+        covered.add(d)
+        cover.append(d)
+        for other in graph[d]:
+            if other not in covered:
+                degree[other] -= 1
+        degree[d] = 0
+    return cover
@@ -23,3 +23,123 @@ def compute_cpa(p0_A: np.ndarray, v_A: np.ndarray, p0_B: np.ndarray, v_B: np.nda
     min_dist = np.linalg.norm(min_dist_vec)
     
     return t_cpa, min_dist
+
+def compute_cpa_batch(p0_A: np.ndarray, v_A: np.ndarray, p0_B: np.ndarray, v_B: np.ndarray):
+    """
+    Vectorised compute_cpa() over N pairs of parametric lines in one NumPy pass.
+    Inputs are stacked (N, D) arrays, row k describing pair k.
+    Returns (t_cpa, min_dist) as (N,) arrays with the same t >= 0 clamp.
+    """
+    w0 = p0_A - p0_B
+    v = v_A - v_B
+    
+    a = np.einsum('ij,ij->i', v, v)
+    b = np.einsum('ij,ij->i', w0, v)
+    
+    # Parallel tracks (a == 0) keep their current separation, i.e. t_cpa = 0
+    t_cpa = np.zeros_like(a)
+    np.divide(-b, a, out=t_cpa, where=a != 0)
+    np.maximum(t_cpa, 0.0, out=t_cpa)
+    
+    min_dist = np.linalg.norm(w0 + v * t_cpa[:, None], axis=1)
+    
+    return t_cpa, min_dist
+
+def compute_segment_cpa_batch(A0_A: np.ndarray, vel_A: np.ndarray, t0_A: np.ndarray,
+                              A0_B: np.ndarray, vel_B: np.ndarray, t0_B: np.ndarray,
+                              overlap_start: np.ndarray, overlap_end: np.ndarray):
+    """
+    Windowed dual-cylinder CPA for N segment pairs, as used by the offline checker.
+    Segment k of A flies P(t) = A0_A[k] + vel_A[k] * (t - t0_A[k]), likewise for B.
+    The horizontal CPA is searched over [overlap_start, overlap_end] (clamped to the
+    window end) and the vertical separation is sampled at that same instant.
+    Returns (t_cpa_abs, min_dist_xy, dist_z) as (N,) arrays.
+    """
+    posA = A0_A + vel_A * (overlap_start - t0_A)[:, None]
+    posB = A0_B + vel_B * (overlap_start - t0_B)[:, None]
+    
+    # Evaluate closest horizontal approach time, then clamp into the overlap window
+    t_cpa_rel, min_dist_xy = compute_cpa_batch(posA[:, :2], vel_A[:, :2], posB[:, :2], vel_B[:, :2])
+    window = overlap_end - overlap_start
+    clamped = t_cpa_rel > window
+    if np.any(clamped):
+        t_cpa_rel = np.where(clamped, window, t_cpa_rel)
+        d_end = (posA[clamped, :2] + vel_A[clamped, :2] * window[clamped, None]) - \
+                (posB[clamped, :2] + vel_B[clamped, :2] * window[clamped, None])
+        min_dist_xy[clamped] = np.linalg.norm(d_end, axis=1)
+    
+    # Exact vertical separation at the moment of minimum horizontal separation
+    dist_z = np.abs((posA[:, 2] + vel_A[:, 2] * t_cpa_rel) - (posB[:, 2] + vel_B[:, 2] * t_cpa_rel))
+    
+    return overlap_start + t_cpa_rel, min_dist_xy, dist_z
+
+def compute_los_interval_batch(A0_A: np.ndarray, vel_A: np.ndarray, t0_A: np.ndarray,
+                               A0_B: np.ndarray, vel_B: np.ndarray, t0_B: np.ndarray,
+                               overlap_start: np.ndarray, overlap_end: np.ndarray,
+                               safety_radius: float, vertical_safety_radius: float):
+    """
+    Exact dual-cylinder loss-of-separation (LoS) test for N segment pairs over their whole
+    overlap window: both |D_xy(t)| < safety_radius and |D_z(t)| < vertical_safety_radius.
+    With relative motion D(t) linear in t, the horizontal condition holds on the open interval
+    between the roots of a quadratic and the vertical one on an open interval of a linear
+    function, so the LoS period is their intersection with the window.
+
+    Cheap lower bounds reject most pairs before the solve: the exact minimum of |D_z| over the
+    window, and |D_xy(mid)| minus the relative distance covered in half the window.
+    Returns (conflict, los_start, los_end): a bool mask and absolute entry/exit times (NaN if clear).
+    """
+    n = len(overlap_start)
+    conflict = np.zeros(n, dtype=bool)
+    los_start = np.full(n, np.nan)
+    los_end = np.full(n, np.nan)
+    
+    window = overlap_end - overlap_start
+    w = (A0_A + vel_A * (overlap_start - t0_A)[:, None]) - (A0_B + vel_B * (overlap_start - t0_B)[:, None])
+    v = vel_A - vel_B
+    
+    # 1. Vertical bound: |D_z| is linear, so its window minimum is 0 on a sign change, else an end value
+    z0 = w[:, 2]
+    z1 = z0 + v[:, 2] * window
+    vertical = (np.abs(z0) < vertical_safety_radius) | (np.abs(z1) < vertical_safety_radius) | (np.sign(z0) != np.sign(z1))
+    # 2. Horizontal bound: no point of the window is closer than |D_xy(mid)| - |v_xy| * window / 2
+    half = window / 2
+    mid = w[:, :2] + v[:, :2] * half[:, None]
+    reach = np.sqrt(np.einsum('ij,ij->i', v[:, :2], v[:, :2])) * half + safety_radius
+    horizontal = np.einsum('ij,ij->i', mid, mid) < reach * reach
+    
+    # Only the survivors go through the exact solve
+    live = np.flatnonzero(vertical & horizontal)
+    if len(live) == 0:
+        return conflict, los_start, los_end
+    w, v, window = w[live], v[live], window[live]
+    
+    # Horizontal: a s^2 + 2 b s + c < 0 (stationary relative motion: always or never)
+    a = np.einsum('ij,ij->i', v[:, :2], v[:, :2])
+    b = np.einsum('ij,ij->i', w[:, :2], v[:, :2])
+    c = np.einsum('ij,ij->i', w[:, :2], w[:, :2]) - safety_radius ** 2
+    disc = b * b - a * c
+    moving = a > 0
+    root = np.sqrt(np.where(moving & (disc > 0), disc, 0.0))
+    safe_a = np.where(moving, a, 1.0)
+    h_lo = np.where(moving, np.where(disc > 0, (-b - root) / safe_a, np.inf), np.where(c < 0, -np.inf, np.inf))
+    h_hi = np.where(moving, np.where(disc > 0, (-b + root) / safe_a, -np.inf), np.where(c < 0, np.inf, -np.inf))
+    
+    # Vertical: |w_z + v_z s| < Rv
+    vz = v[:, 2]
+    climbing = vz != 0
+    safe_vz = np.where(climbing, vz, 1.0)
+    e1 = (-vertical_safety_radius - w[:, 2]) / safe_vz
+    e2 = (vertical_safety_radius - w[:, 2]) / safe_vz
+    level_inside = np.abs(w[:, 2]) < vertical_safety_radius
+    v_lo = np.where(climbing, np.minimum(e1, e2), np.where(level_inside, -np.inf, np.inf))
+    v_hi = np.where(climbing, np.maximum(e1, e2), np.where(level_inside, np.inf, -np.inf))
+    
+    lo = np.maximum(h_lo, v_lo)
+    hi = np.minimum(h_hi, v_hi)
+    hit = (lo < hi) & (lo < window) & (hi > 0)
+    
+    rows = live[hit]
+    conflict[rows] = True
+    los_start[rows] = overlap_start[rows] + np.maximum(lo[hit], 0.0)
+    los_end[rows] = overlap_start[rows] + np.minimum(hi[hit], window[hit])
+    return conflict, los_start, los_end
@@ -0,0 +1,158 @@
+import numpy as np
+
+def _solve_lines(n1, c1, n2, c2):
+    """Intersections of line pairs n1 . x = c1 and n2 . x = c2, stacked over the last axis."""
+    det = n1[..., 0] * n2[..., 1] - n1[..., 1] * n2[..., 0]
+    ok = np.abs(det) > 1e-12
+    safe = np.where(ok, det, 1.0)
+    x = np.stack(((c1 * n2[..., 1] - c2 * n1[..., 1]) / safe,
+                  (n1[..., 0] * c2 - n2[..., 0] * c1) / safe), axis=-1)
+    return x, ok
+
+def _point_segment_distance(p, a, b):
+    ab = b - a
+    L = np.einsum('ni,ni->n', ab, ab)
+    t = np.clip(np.einsum('ni,ni->n', p - a, ab) / np.where(L > 0, L, 1.0), 0.0, 1.0)
+    return np.linalg.norm(a + t[:, None] * ab - p, axis=1)
+
+def path_distance_2d(P0: np.ndarray, P1: np.ndarray, Q0: np.ndarray, Q1: np.ndarray) -> np.ndarray:
+    """Minimum horizontal distance between the paths P0->P1 and Q0->Q1 (stacked), ignoring time."""
+    P0, P1, Q0, Q1 = P0[:, :2], P1[:, :2], Q0[:, :2], Q1[:, :2]
+    d = np.minimum(np.minimum(_point_segment_distance(P0, Q0, Q1), _point_segment_distance(P1, Q0, Q1)),
+                   np.minimum(_point_segment_distance(Q0, P0, P1), _point_segment_distance(Q1, P0, P1)))
+    def side(o, a, b):
+        return (a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (b[:, 0] - o[:, 0])
+    crossing = (side(Q0, Q1, P0) * side(Q0, Q1, P1) < 0) & (side(P0, P1, Q0) * side(P0, P1, Q1) < 0)
+    return np.where(crossing, 0.0, d)
+
+def forbidden_delay_intervals(A0_A: np.ndarray, vel_A: np.ndarray, t0_A: np.ndarray, t1_A: np.ndarray,
+                              A0_B: np.ndarray, vel_B: np.ndarray, t0_B: np.ndarray, t1_B: np.ndarray,
+                              safety_radius: float, vertical_safety_radius: float):
+    """
+    Closed-form set of departure delays tau for which leg A (shifted by +tau) loses dual-cylinder
+    separation with the fixed leg B, for N leg pairs at once (see _forbidden_delay_intervals).
+    Pairs whose horizontal paths never come within the separation are clear at every delay and
+    skip the solve. Returns (lo, hi, valid): the open forbidden interval (lo, hi) and whether it is non-empty.
+    """
+    R = safety_radius
+    near = path_distance_2d(A0_A, A0_A + vel_A * (t1_A - t0_A)[:, None],
+                            A0_B, A0_B + vel_B * (t1_B - t0_B)[:, None]) <= R * (1 + 1e-9) + 1e-9
+    if near.all():
+        return _forbidden_delay_intervals(A0_A, vel_A, t0_A, t1_A, A0_B, vel_B, t0_B, t1_B, R, vertical_safety_radius)
+    lo = np.full(len(t0_A), np.nan)
+    hi = np.full(len(t0_A), np.nan)
+    valid = np.zeros(len(t0_A), dtype=bool)
+    k = np.flatnonzero(near)
+    if len(k):
+        lo[k], hi[k], valid[k] = _forbidden_delay_intervals(
+            A0_A[k], vel_A[k], t0_A[k], t1_A[k], A0_B[k], vel_B[k], t0_B[k], t1_B[k], R, vertical_safety_radius
+        )
+    return lo, hi, valid
+
+def _forbidden_delay_intervals(A0_A: np.ndarray, vel_A: np.ndarray, t0_A: np.ndarray, t1_A: np.ndarray,
+                               A0_B: np.ndarray, vel_B: np.ndarray, t0_B: np.ndarray, t1_B: np.ndarray,
+                               safety_radius: float, vertical_safety_radius: float):
+    """
+    Closed-form set of departure delays tau for which leg A (shifted by +tau) loses dual-cylinder
+    separation with the fixed leg B, for N leg pairs at once.
+
+    With s = time along A's own schedule and t = s + tau, the pairs (s, t) that violate separation
+    form a convex region: the rectangle [t0_A, t1_A] x [t0_B, t1_B], intersected with the horizontal
+    disc |D_xy| < R (an ellipse in (s, t)) and the vertical strip |D_z| < Rv. The forbidden delays
+    are the projection of that region onto t - s, i.e. a single interval per pair. Its end points
+    lie on the region boundary, so they are found by evaluating t - s at every rectangle vertex,
+    line/line and line/ellipse intersection and ellipse tangent, keeping the feasible ones.
+
+    Returns (lo, hi, valid): the open forbidden interval (lo, hi) and whether it is non-empty.
+    """
+    R, Rv = safety_radius, vertical_safety_radius
+    n = len(t0_A)
+    # Local coordinates: u = s - t0_A in [0, L_A], w = t - t0_B in [0, L_B]; tau = w - u + (t0_B - t0_A)
+    L_A = t1_A - t0_A
+    L_B = t1_B - t0_B
+    a = A0_A - A0_B                                       # D(u, w) = a + vel_A * u - vel_B * w
+    M = np.stack((vel_A[:, :2], -vel_B[:, :2]), axis=-1)  # (n, 2, 2) horizontal map of (u, w)
+    a_h = a[:, :2]
+    nz = np.stack((vel_A[:, 2], -vel_B[:, 2]), axis=-1)   # vertical: a_z + nz . (u, w)
+    a_z = a[:, 2]
+
+    # The six boundary lines in normal form n . x = c: four rectangle edges and two strip edges
+    zeros, ones = np.zeros(n), np.ones(n)
+    normals = np.stack((
+        np.stack((ones, zeros), -1), np.stack((ones, zeros), -1),
+        np.stack((zeros, ones), -1), np.stack((zeros, ones), -1),
+        nz, nz
+    ), axis=1)                                            # (n, 6, 2)
+    offsets = np.stack((zeros, L_A, zeros, L_B, Rv - a_z, -Rv - a_z), axis=1)
+
+    points = []
+
+    # Line/line intersections (includes the rectangle vertices)
+    i1, i2 = np.triu_indices(6, k=1)
+    x, ok = _solve_lines(normals[:, i1], offsets[:, i1], normals[:, i2], offsets[:, i2])
+    points.append(np.where(ok[..., None], x, np.nan))
+
+    # Line/ellipse intersections: x = p + lam * d on |a_h + M x| = R
+    nn = np.einsum('nkj,nkj->nk', normals, normals)
+    has_line = nn > 1e-12
+    p = normals * np.where(has_line, offsets / np.where(has_line, nn, 1.0), 0.0)[..., None]
+    d = np.stack((-normals[..., 1], normals[..., 0]), axis=-1)
+    y0 = a_h[:, None, :] + np.einsum('nij,nkj->nki', M, p)
+    yd = np.einsum('nij,nkj->nki', M, d)
+    qa = np.einsum('nki,nki->nk', yd, yd)
+    qb = 2.0 * np.einsum('nki,nki->nk', y0, yd)
+    qc = np.einsum('nki,nki->nk', y0, y0) - R * R
+    disc = qb * qb - 4.0 * qa * qc
+    quad = has_line & (qa > 1e-12) & (disc >= 0)
+    root = np.sqrt(np.where(quad, disc, 0.0))
+    den = np.where(quad, 2.0 * qa, 1.0)
+    for sign in (-1.0, 1.0):
+        lam = (-qb + sign * root) / den
+        points.append(np.where(quad[..., None], p + lam[..., None] * d, np.nan))
+
+    # Ellipse tangents of t - s: M^T y parallel to (-1, 1) with |y| = R
+    det = M[:, 0, 0] * M[:, 1, 1] - M[:, 0, 1] * M[:, 1, 0]
+    inv_ok = np.abs(det) > 1e-12
+    safe_det = np.where(inv_ok, det, 1.0)
+    M_inv = np.stack((np.stack((M[:, 1, 1], -M[:, 0, 1]), -1),
+                      np.stack((-M[:, 1, 0], M[:, 0, 0]), -1)), axis=1) / safe_det[:, None, None]
+    g = np.einsum('nji,j->ni', M_inv, np.array([-1.0, 1.0]))   # M^-T (-1, 1)
+    g_norm = np.linalg.norm(g, axis=1)
+    tan_ok = inv_ok & (g_norm > 1e-12)
+    for sign in (-1.0, 1.0):
+        y = sign * R * g / np.where(tan_ok, g_norm, 1.0)[:, None]
+        x = np.einsum('nij,nj->ni', M_inv, y - a_h)
+        points.append(np.where(tan_ok[:, None], x, np.nan)[:, None, :])
+
+    pts = np.concatenate(points, axis=1)                  # (n, K, 2)
+    u, w = pts[..., 0], pts[..., 1]
+
+    # Keep only candidates inside every constraint (small tolerances absorb round-off)
+    eps_t = 1e-9 * (1.0 + np.maximum(L_A, L_B))[:, None]
+    y_h = a_h[:, None, :] + np.einsum('nij,nkj->nki', M, pts)
+    z = a_z[:, None] + nz[:, None, 0] * u + nz[:, None, 1] * w
+    with np.errstate(invalid='ignore'):
+        feasible = ((u >= -eps_t) & (u <= L_A[:, None] + eps_t) &
+                    (w >= -eps_t) & (w <= L_B[:, None] + eps_t) &
+                    (np.einsum('nki,nki->nk', y_h, y_h) <= R * R * (1 + 1e-9) + 1e-9) &
+                    (np.abs(z) <= Rv * (1 + 1e-9) + 1e-9))
+
+    tau = w - u + (t0_B - t0_A)[:, None]
+    valid = feasible.any(axis=1)
+    lo = np.where(valid, np.min(np.where(feasible, tau, np.inf), axis=1), np.nan)
+    hi = np.where(valid, np.max(np.where(feasible, tau, -np.inf), axis=1), np.nan)
+    return lo, hi, valid
+
+def earliest_safe_delay(lo: np.ndarray, hi: np.ndarray, min_delay: float = 0.0, margin: float = 1e-6) -> float:
+    """
+    Smallest delay >= min_delay outside the union of open forbidden intervals (lo, hi).
+    `margin` nudges results that land exactly on an interval end (tangential contact) clear of round-off.
+    """
+    order = np.argsort(lo)
+    delay = min_delay
+    for l, h in zip(lo[order].tolist(), hi[order].tolist()):
+        if l >= delay:
+            break
+        if h >= delay:
+            delay = h + margin
+    return delay
@@ -0,0 +1,129 @@
+import numpy as np
+
+# Cofactors of a symmetric 3x3 matrix in flattened (row-major) positions: C = S[i] * S[j] - S[k] * S[l]
+_COF = np.array([(4, 8, 5, 5), (2, 5, 1, 8), (1, 5, 2, 4),
+                 (2, 5, 1, 8), (0, 8, 2, 2), (1, 2, 0, 5),
+                 (1, 5, 2, 4), (1, 2, 0, 5), (0, 4, 1, 1)]).T
+
+def _inv_sym3(S: np.ndarray) -> np.ndarray:
+    """Closed-form inverse of stacked symmetric 3x3 matrices (cofactors over the determinant)."""
+    flat = S.reshape(-1, 9)
+    cof = flat[:, _COF[0]] * flat[:, _COF[1]] - flat[:, _COF[2]] * flat[:, _COF[3]]
+    det = np.einsum('ni,ni->n', flat[:, :3], cof[:, :3])
+    return (cof / det[:, None]).reshape(-1, 3, 3)
+
+_DIAG3 = np.arange(3)
+_DIAG6 = np.arange(6)
+
+class KalmanBank:
+    """
+    Bank of constant-velocity Kalman filters (state x, y, z, vx, vy, vz), one per tracked drone,
+    stored as stacked (N, 6) state and (N, 6, 6) covariance arrays so that every filter with a
+    pending measurement is predicted and corrected in one batched operation.
+    Position-only measurements make the innovation covariance S the top-left 3x3 block of the
+    predicted covariance plus R, so the gain uses a closed-form 3x3 inverse instead of a general one.
+    """
+    def __init__(self, capacity: int = 64, process_noise: float = 0.1, measurement_noise: float = 2.0,
+                 initial_variance: float = 1.0):
+        capacity = max(1, capacity)
+        self.state = np.zeros((capacity, 6))
+        self.covariance = np.zeros((capacity, 6, 6))
+        self.last_update = np.zeros(capacity)
+        self.process_noise = process_noise          # Q = q * dt * I
+        self.measurement_noise = measurement_noise  # R = r * I (m^2, GPS noise)
+        self.initial_variance = initial_variance
+
+        # Stable id <-> slot mapping; freed slots are reused
+        self.slot = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slot)
+
+    def __contains__(self, drone_id: str):
+        return drone_id in self.slot
+
+    def _reserve(self, extra: int):
+        if len(self._free) >= extra:
+            return
+        capacity = len(self.last_update)
+        new_capacity = max(2 * capacity, capacity + extra)
+        for name in ("state", "covariance", "last_update"):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:])
+            new[:capacity] = old
+            setattr(self, name, new)
+        self._free = list(range(new_capacity - 1, capacity - 1, -1)) + self._free
+
+    def update(self, drone_ids: list, measurements: np.ndarray, timestamps: np.ndarray, velocities: np.ndarray = None):
+        """
+        Applies M position measurements (M, 3) taken at `timestamps` (M,) in one batch.
+        Unknown drones start a filter at their first measurement, seeded with `velocities` (M, 3)
+        if given. Several measurements of one drone are applied in arrival order.
+        """
+        measurements = np.asarray(measurements, dtype=float).reshape(-1, 3)
+        timestamps = np.asarray(timestamps, dtype=float)
+        velocities = np.zeros_like(measurements) if velocities is None else np.asarray(velocities, dtype=float).reshape(-1, 3)
+
+        if len(set(drone_ids)) == len(drone_ids):
+            self._update_wave(drone_ids, measurements, timestamps, velocities)
+            return
+        # Split into waves holding at most one measurement per drone, preserving per-drone order
+        seen = {}
+        wave = np.empty(len(drone_ids), dtype=np.int64)
+        for i, drone_id in enumerate(drone_ids):
+            wave[i] = seen.get(drone_id, 0)
+            seen[drone_id] = wave[i] + 1
+        for w in range(int(wave.max()) + 1):
+            rows = np.flatnonzero(wave == w)
+            self._update_wave([drone_ids[i] for i in rows], measurements[rows], timestamps[rows], velocities[rows])
+
+    def _update_wave(self, drone_ids: list, z: np.ndarray, t: np.ndarray, v: np.ndarray):
+        slot = self.slot
+        new = [i for i, d in enumerate(drone_ids) if d not in slot]
+        if new:
+            self._reserve(len(new))
+            for i in new:
+                s = self._free.pop()
+                slot[drone_ids[i]] = s
+                self.state[s, :3] = z[i]
+                self.state[s, 3:] = v[i]
+                self.covariance[s] = np.eye(6) * self.initial_variance
+                self.last_update[s] = t[i]
+            if len(new) == len(drone_ids):
+                return
+            old = np.ones(len(drone_ids), dtype=bool)
+            old[new] = False
+            z, t = z[old], t[old]
+            drone_ids = [d for d, o in zip(drone_ids, old.tolist()) if o]
+        slots = np.array([slot[d] for d in drone_ids], dtype=np.int64)
+        x = self.state[slots]
+        P = self.covariance[slots]
+        dt = np.maximum(0.001, t - self.last_update[slots])[:, None]
+
+        # Prediction: x' = F x, P' = F P F^T + Q with F = [[I, dt I], [0, I]],
+        # applied as F's row operation then its column operation instead of two 6x6 products
+        x[:, :3] += dt * x[:, 3:]
+        P[:, :3, :] += dt[:, :, None] * P[:, 3:, :]
+        P[:, :, :3] += dt[:, None, :] * P[:, :, 3:]
+        P[:, _DIAG6, _DIAG6] += self.process_noise * dt
+
+        # Correction with H = [I 0]: S = P[:3, :3] + R, K = P[:, :3] S^-1
+        S = P[:, :3, :3].copy()
+        S[:, _DIAG3, _DIAG3] += self.measurement_noise
+        K = P[:, :, :3] @ _inv_sym3(S)
+        x += (K @ (z - x[:, :3])[:, :, None])[:, :, 0]
+        P -= K @ P[:, :3, :]
+
+        self.state[slots] = x
+        self.covariance[slots] = P
+        self.last_update[slots] = t
+
+    def remove(self, drone_id: str):
+        s = self.slot.pop(drone_id, None)
+        if s is not None:
+            self._free.append(s)
+
+    def clear(self):
+        self._free = list(range(len(self.last_update) - 1, -1, -1))
+        self.slot.clear()
@@ -0,0 +1,103 @@
+import json
+
+_WHITESPACE = " \t\r\n"
+
+class _JSONStream:
+    """Minimal pull reader over a text stream: decodes one JSON value at a time from a sliding buffer."""
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer only ever holds about one drone record
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed mission file: expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                # Objects and strings are self-delimiting, so a successful decode is never a truncated value
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return obj
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+def _iter_object(stream: _JSONStream):
+    # {"<drone_id>": {...}, "<drone_id>": {...}, ...}
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        drone_id = stream.value()
+        stream.expect(":")
+        yield drone_id, stream.value()
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        stream.expect("}")
+        return
+
+def _iter_ndjson(f):
+    # One drone per line, either {"drone_id": ..., "waypoints": [...], ...} or {"<drone_id>": {...}}
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if "drone_id" in record and "waypoints" in record:
+            info = dict(record)
+            yield info.pop("drone_id"), info
+        else:
+            yield from record.items()
+
+def iter_mission_file(source, ndjson: bool = None, chunk_size: int = 1 << 16):
+    """
+    Streams (drone_id, info) records from a mission file without loading the whole JSON tree.
+    `source` is a path or an open text stream (e.g. a pipe). Newline-delimited JSON is read when
+    `ndjson` is True, or by default for paths ending in .ndjson / .jsonl.
+    """
+    if isinstance(source, str):
+        if ndjson is None:
+            ndjson = source.endswith((".ndjson", ".jsonl"))
+        with open(source, "r") as f:
+            yield from iter_mission_file(f, ndjson, chunk_size)
+        return
+
+    if ndjson:
+        yield from _iter_ndjson(source)
+    else:
+        yield from _iter_object(_JSONStream(source, chunk_size))
+
+def write_mission_ndjson(data: dict, f):
+    """Writes a {drone_id: info} mission in the newline-delimited format read by iter_mission_file."""
+    for drone_id, info in data.items():
+        f.write(json.dumps(dict(info, drone_id=drone_id)))
+        f.write("\n")
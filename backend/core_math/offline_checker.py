@@ -1,14 +1,85 @@
 import numpy as np
 import json
 import os
-from .cpa import compute_cpa
-from ..spatial.rtree_filter import SpatialTemporalIndex
+from .cpa import compute_segment_cpa_batch, compute_los_interval_batch
+from .segment_table import SegmentTable
+from .resolver_pool import ResolverPool
+from .sharded_detection import detect_conflicts_sharded, sharded_conflict_pairs
+from .conflict_cache import ConflictCache
+from .conflict_graph import build_conflict_graph, greedy_vertex_cover
+from .departure_solver import forbidden_delay_intervals, earliest_safe_delay
+from .mission_stream import iter_mission_file
+from .columnar_io import is_columnar, load_table, save_report
+from ..spatial.rtree_filter import SpatialTemporalIndex, segment_boxes, split_boxes
+
+def waypoint_legs(wps: np.ndarray, start_time: float, end_time: float = None, velocity: float = None) -> dict:
+    """
+    Constant-velocity legs (a drone_legs()-style dict) flown through an (m, 3) waypoint array.
+    The speed is fitted to `end_time` if given, else `velocity`, else 5 m/s.
+    """
+    deltas = wps[1:] - wps[:-1]
+    dists = np.linalg.norm(deltas, axis=1)
+    total_dist = float(dists.sum())
+        
+    if end_time is not None and total_dist > 0:
+        velocity = total_dist / (end_time - start_time)
+    elif velocity is None:
+        velocity = 5.0
+        
+    # Zero-length legs take no time and are dropped
+    keep = dists != 0
+    durations = dists[keep] / velocity
+    times = np.cumsum(np.concatenate(([float(start_time)], durations)))
+    return {
+        "A0": wps[:-1][keep], "A1": wps[1:][keep], "velocity": deltas[keep] / durations[:, None],
+        "t_start": times[:-1], "t_end": times[1:]
+    }
+
+def shifted_legs(legs: dict, delay: float, shift: np.ndarray = None) -> dict:
+    """
+    Returns a copy of a drone's legs delayed by `delay` seconds and offset by `shift` metres.
+    Endpoints are floor-clamped at z = 0; velocities are kept as planned.
+    """
+    out = {k: v.copy() for k, v in legs.items()}
+    out["t_start"] += delay
+    out["t_end"] += delay
+    if shift is not None:
+        out["A0"] += shift
+        out["A1"] += shift
+        np.maximum(out["A0"][:, 2], 0.0, out=out["A0"][:, 2])
+        np.maximum(out["A1"][:, 2], 0.0, out=out["A1"][:, 2])
+    return out
+
 
 class OfflineBatchChecker:
-    def __init__(self, safety_radius: float = 3.0, vertical_safety_radius: float = 15.0):
+    def __init__(self, safety_radius: float = 3.0, vertical_safety_radius: float = 15.0, max_leg_pieces: int = 1,
+                 max_box_ratio: float = None, cache: ConflictCache = None):
         self.safety_radius = safety_radius
         self.vertical_safety_radius = vertical_safety_radius
-        self.segments = []
+        
+        # Steep legs are indexed as up to this many time sub-interval boxes (1 disables splitting);
+        # with max_box_ratio set, long diagonal legs are also split until their boxes fit the sweep
+        self.max_leg_pieces = max_leg_pieces
+        self.max_box_ratio = max_box_ratio
+        
+        # Optional cross-request result cache; only drones whose legs changed get re-checked
+        self.cache = cache
+        self.last_stats = {}
+        self.table = SegmentTable()
+        self._index = None
+        self._index_key = None
+        
+        # Drones temporarily excluded from the committed fleet while the resolver re-plans them
+        self.parked = set()
+
+    @property
+    def segments(self):
+        """Legacy row-wise view of the segment table (one dict per leg)."""
+        return self.table.records()
+
+    @segments.setter
+    def segments(self, records: list):
+        self.table = SegmentTable.from_records(records)
         
     def parse_mission_file(self, filepath: str):
         with open(filepath, 'r') as f:
@@ -29,232 +100,510 @@ class OfflineBatchChecker:
         if not waypoints or len(waypoints) < 2:
             return
             
-        total_dist = 0.0
-        dists = []
-        vecs = []
-        for i in range(len(waypoints) - 1):
-            w0 = np.array([waypoints[i]["x"], waypoints[i]["y"], waypoints[i].get("z", 50.0)], dtype=float)
-            w1 = np.array([waypoints[i+1]["x"], waypoints[i+1]["y"], waypoints[i+1].get("z", 50.0)], dtype=float)
-            dist = np.linalg.norm(w1 - w0)
-            dists.append(dist)
-            total_dist += dist
-            vecs.append((w0, w1))
-            
-        if end_time is not None and total_dist > 0:
-            velocity = total_dist / (end_time - start_time)
-        elif velocity is None:
-            velocity = 5.0
-            
-        current_time = start_time
-        for i in range(len(vecs)):
-            w0, w1 = vecs[i]
-            dist = dists[i]
-            if dist == 0:
+        wps = np.array([[w["x"], w["y"], w.get("z", 50.0)] for w in waypoints], dtype=float)
+        self.add_waypoint_array(drone_id, wps, start_time, end_time, velocity)
+
+    def add_waypoint_array(self, drone_id: str, wps: np.ndarray, start_time: float, end_time: float = None, velocity: float = None):
+        """Converts an (m, 3) waypoint array into constant-velocity legs in bulk."""
+        if len(wps) < 2:
+            return
+        legs = waypoint_legs(wps, start_time, end_time, velocity)
+        self.table.append_legs(drone_id, legs["A0"], legs["A1"], legs["velocity"], legs["t_start"], legs["t_end"])
+
+    def stream_mission_file(self, source, ndjson: bool = None, batch_size: int = 1024):
+        """
+        Streaming counterpart of parse_mission_file for very large missions (JSON object or NDJSON).
+        Drones are decoded one at a time and converted to legs in batches of `batch_size`,
+        so neither the JSON tree nor per-drone waypoint lists are held for the whole file.
+        """
+        batch = []
+        for drone_id, info in iter_mission_file(source, ndjson):
+            waypoints = info.get("waypoints", [])
+            if not waypoints or len(waypoints) < 2:
                 continue
-                
-            time_duration = dist / velocity
-            seg_end_time = current_time + time_duration
-            
-            v_vec = (w1 - w0) / time_duration
-            
-            self.segments.append({
-                "drone_id": drone_id,
-                "A0": w0,
-                "A1": w1,
-                "velocity": v_vec,
-                "t_start": current_time,
-                "t_end": seg_end_time
-            })
-            current_time = seg_end_time
+            batch.append((drone_id, waypoints, info.get("start_time", 0.0), info.get("end_time"), info.get("velocity")))
+            if len(batch) >= batch_size:
+                self._add_waypoint_batch(batch)
+                batch = []
+        if batch:
+            self._add_waypoint_batch(batch)
 
-    def detect_conflicts(self):
-        conflicts = []
+    def load_columnar(self, path: str):
+        """Opens a stored columnar segment table (see columnar_io) in place of parsing a mission file."""
+        self.table = load_table(path)
+
+    def update_mission_data(self, data: dict):
+        """Re-plans the given drones of an already loaded mission: their old legs are replaced, others kept."""
+        for drone_id in data:
+            self.table.remove_drone_legs(drone_id)
+        self.parse_mission_data(data)
+
+    def _add_waypoint_batch(self, batch: list):
+        """Vectorised add_waypoint_array over many drones: one waypoint array, one table append."""
+        drone_ids = [b[0] for b in batch]
+        counts = np.array([len(b[1]) for b in batch])
+        wps = np.array([[w["x"], w["y"], w.get("z", 50.0)] for b in batch for w in b[1]], dtype=float)
+        starts = np.array([b[2] for b in batch], dtype=float)
+        end_times = np.array([np.nan if b[3] is None else b[3] for b in batch], dtype=float)
+        velocities = np.array([np.nan if b[4] is None else b[4] for b in batch], dtype=float)
         
-        index = SpatialTemporalIndex(self.safety_radius)
-        for seg in self.segments:
-            index.insert_segment(seg)
-            
-        candidates = index.query_candidates()
+        # Legs are consecutive waypoint pairs that do not straddle two drones
+        first_wp = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        leg_drone = np.repeat(np.arange(len(batch)), counts - 1)
+        leg_from = np.arange(len(wps) - 1)
+        leg_from = leg_from[np.isin(leg_from, first_wp[1:] - 1, invert=True)]
+        deltas = wps[leg_from + 1] - wps[leg_from]
+        dists = np.linalg.norm(deltas, axis=1)
+        total_dist = np.bincount(leg_drone, weights=dists, minlength=len(batch))
         
-        for segA, segB in candidates:
-            overlap_start = max(segA["t_start"], segB["t_start"])
-            overlap_end = min(segA["t_end"], segB["t_end"])
-            
-            if overlap_start >= overlap_end:
-                continue
+        # Same speed rules as add_waypoint_array: fit end_time, else given velocity, else 5 m/s
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fitted = total_dist / (end_times - starts)
+        speed = np.where(~np.isnan(end_times) & (total_dist > 0), fitted,
+                         np.where(np.isnan(velocities), 5.0, velocities))
+        
+        keep = dists != 0
+        leg_from, leg_drone, deltas, dists = leg_from[keep], leg_drone[keep], deltas[keep], dists[keep]
+        durations = dists / speed[leg_drone]
+        # Per-drone running clock: global cumsum minus the total at each drone's first leg
+        leg_counts = np.bincount(leg_drone, minlength=len(batch))
+        first_leg = np.cumsum(leg_counts) - leg_counts
+        clock = np.cumsum(durations)
+        t_end = clock - np.repeat(np.concatenate(([0.0], clock))[first_leg], leg_counts) + starts[leg_drone]
+        t_start = np.concatenate(([0.0], t_end[:-1]))
+        t_start[first_leg[leg_counts > 0]] = starts[leg_counts > 0]
+        
+        self.table.append_batch(
+            drone_ids, leg_counts,
+            wps[leg_from], wps[leg_from + 1],
+            deltas / durations[:, None],
+            t_start, t_end
+        )
+
+    def leg_boxes(self, A0: np.ndarray, A1: np.ndarray, t_start: np.ndarray, t_end: np.ndarray):
+        """
+        Broad-phase boxes of legs, padded by half the horizontal and half the vertical separation:
+        two boxes overlap exactly when the legs' extents come within both separation minima.
+        """
+        return segment_boxes(A0, A1, t_start, t_end, self.safety_radius / 2, self.vertical_safety_radius / 2)
+
+    def leg_pieces(self, A0: np.ndarray, A1: np.ndarray) -> np.ndarray:
+        """
+        Index boxes per leg: steep legs are cut so each piece climbs at most one vertical separation.
+        With max_box_ratio, a leg is also cut into the fewest pieces whose boxes fill at most
+        max_box_ratio times the volume its padded cross-section actually sweeps.
+        """
+        climb = np.abs(A1[:, 2] - A0[:, 2])
+        pieces = np.ceil(climb / self.vertical_safety_radius).astype(np.int64)
+        if self.max_box_ratio is not None and self.max_leg_pieces > 1:
+            # A constant-velocity leg sweeps its padded cross-section (R x R x Rv) through space-time,
+            # while k pieces box (|dx|/k + R)(|dy|/k + R)(|dz|/k + Rv) over the same duration
+            extent = np.abs(A1 - A0) / np.array([self.safety_radius, self.safety_radius, self.vertical_safety_radius])
+            k = np.arange(1, self.max_leg_pieces + 1)
+            ratio = np.prod(1.0 + extent[:, None, :] / k[None, :, None], axis=2)
+            fits = ratio <= self.max_box_ratio
+            by_ratio = np.where(fits.any(axis=1), k[np.argmax(fits, axis=1)], self.max_leg_pieces)
+            pieces = np.maximum(pieces, by_ratio)
+        return np.clip(pieces, 1, self.max_leg_pieces)
+
+    def index_boxes(self, A0: np.ndarray, A1: np.ndarray, t_start: np.ndarray, t_end: np.ndarray, pieces: np.ndarray = None):
+        """leg_boxes() split per leg_pieces(); returns (mins, maxs, parent) as split_boxes does."""
+        if pieces is None:
+            pieces = self.leg_pieces(A0, A1)
+        return split_boxes(A0, A1, t_start, t_end, pieces, self.safety_radius / 2, self.vertical_safety_radius / 2)
+
+    def _index_state(self) -> tuple:
+        return (id(self.table), self.table.version, self.safety_radius, self.vertical_safety_radius,
+                self.max_leg_pieces, self.max_box_ratio)
+
+    def spatial_index(self) -> SpatialTemporalIndex:
+        """Bulk-loaded 4D index over the current table, reused until the table changes."""
+        key = self._index_state()
+        if self._index is None or self._index_key != key:
+            t = self.table
+            pieces = self.leg_pieces(t.A0, t.A1) if self.max_leg_pieces > 1 else None
+            self._index = SpatialTemporalIndex.from_table(t, self.safety_radius, self.vertical_safety_radius, pieces)
+            self._index_key = key
+        return self._index
+
+    def detect_conflicts(self, workers: int = None, shard_by: str = "time"):
+        """
+        All conflicts of the loaded mission. With `workers` > 1 the check is sharded across processes,
+        by time slab (shard_by="time") or by geographic tile (shard_by="space"); the report is unchanged.
+        """
+        if self.cache is not None:
+            return self.conflict_report(self._cached_conflict_pairs(workers, shard_by))
+        if workers and workers > 1:
+            return detect_conflicts_sharded(self, workers, shard_by)
+        table = self.table
+        
+        index = self.spatial_index()
+        candidates = index.self_join()
+        self.last_stats = dict(index.last_stats, legs=len(table), conflicts=0)
+        if len(candidates) == 0:
+            return []
             
-            t_offset_A = overlap_start - segA["t_start"]
-            t_offset_B = overlap_start - segB["t_start"]
+        rows_A, rows_B = candidates[:, 0], candidates[:, 1]
+        conflicts = self._narrow_phase(
+            table.A0[rows_A], table.velocity[rows_A], table.t_start[rows_A], table.t_end[rows_A], table.drone_idx[rows_A],
+            table.A0[rows_B], table.velocity[rows_B], table.t_start[rows_B], table.t_end[rows_B], table.drone_idx[rows_B]
+        )
+        self.last_stats["conflicts"] = len(conflicts)
+        return conflicts
+
+    def conflict_pairs(self, workers: int = None, shard_by: str = "time") -> np.ndarray:
+        """Sorted (K, 2) table-row pairs (i < j) of conflicting legs, without building the report."""
+        if workers and workers > 1:
+            return sharded_conflict_pairs(self, workers, shard_by)
+        index = self.spatial_index()
+        candidates = index.self_join()
+        pairs = candidates[self._row_pair_hits(candidates)]
+        self.last_stats = dict(index.last_stats, legs=len(self.table), conflicts=len(pairs))
+        return pairs
+
+    def conflict_report(self, pairs: np.ndarray) -> list:
+        """Conflict report dicts (as detect_conflicts returns) for conflicting table-row pairs."""
+        if len(pairs) == 0:
+            return []
+        table = self.table
+        a, b = pairs[:, 0], pairs[:, 1]
+        return self._narrow_phase(
+            table.A0[a], table.velocity[a], table.t_start[a], table.t_end[a], table.drone_idx[a],
+            table.A0[b], table.velocity[b], table.t_start[b], table.t_end[b], table.drone_idx[b]
+        )
+
+    def _row_pair_hits(self, pairs: np.ndarray) -> np.ndarray:
+        table = self.table
+        a, b = pairs[:, 0], pairs[:, 1]
+        return self._narrow_phase_hits(
+            table.A0[a], table.velocity[a], table.t_start[a], table.t_end[a],
+            table.A0[b], table.velocity[b], table.t_start[b], table.t_end[b]
+        )[0]
+
+    def _cached_conflict_pairs(self, workers: int, shard_by: str) -> np.ndarray:
+        """
+        conflict_pairs() through the result cache. Pairs among drones the cache has already checked
+        together are answered from it; only pairs involving the remaining drones are computed,
+        by probing the index with their legs. The completed check is stored back.
+        """
+        table = self.table
+        keys = ConflictCache.drone_keys(table, self.safety_radius, self.vertical_safety_radius)
+        known = self.cache.known_drones(keys)
+        if not known:
+            pairs = self.conflict_pairs(workers, shard_by)
+        else:
+            starts = np.array([start for start, _ in table._row_range], dtype=np.int64)
+            changed = [np.arange(*table._row_range[d]) for d, k in enumerate(keys) if k is not None and d not in known]
+            found = [np.empty((0, 2), dtype=np.int64)]
+            if changed:
+                rows = np.concatenate(changed)
+                mins, maxs = self.leg_boxes(table.A0[rows], table.A1[rows], table.t_start[rows], table.t_end[rows])
+                query, other = self.spatial_index().query_boxes(mins, maxs)
+                a, b = rows[query], other
+                keep = table.drone_idx[a] != table.drone_idx[b]
+                # Pairs of two changed drones are found from both sides: keep one
+                key = np.unique(np.minimum(a[keep], b[keep]) * table.n + np.maximum(a[keep], b[keep]))
+                candidates = np.column_stack((key // table.n, key % table.n))
+                found.append(candidates[self._row_pair_hits(candidates)])
+            for i, j, legs in self.cache.known_hits(keys, known):
+                rows_i, rows_j = starts[i] + legs[:, 0], starts[j] + legs[:, 1]
+                found.append(np.column_stack((np.minimum(rows_i, rows_j), np.maximum(rows_i, rows_j))))
+            pairs = np.unique(np.concatenate(found), axis=0)
+            self.last_stats = {"legs": len(table), "cached_drones": len(known), "rechecked_drones": len(changed),
+                               "conflicts": len(pairs)}
+        self.cache.store(keys, self._hits_by_drone_pair(pairs))
+        return pairs
+
+    def _hits_by_drone_pair(self, pairs: np.ndarray) -> dict:
+        """Groups conflicting row pairs as {(drone_i, drone_j): (k, 2) local leg indices}."""
+        if len(pairs) == 0:
+            return {}
+        table = self.table
+        starts = np.array([start for start, _ in table._row_range], dtype=np.int64)
+        d_i, d_j = table.drone_idx[pairs[:, 0]].astype(np.int64), table.drone_idx[pairs[:, 1]].astype(np.int64)
+        legs = np.column_stack((pairs[:, 0] - starts[d_i], pairs[:, 1] - starts[d_j]))
+        order = np.lexsort((d_j, d_i))
+        d_i, d_j, legs = d_i[order], d_j[order], legs[order]
+        bounds = np.flatnonzero((np.diff(d_i) != 0) | (np.diff(d_j) != 0)) + 1
+        return {(int(g_i[0]), int(g_j[0])): g_legs
+                for g_i, g_j, g_legs in zip(np.split(d_i, bounds), np.split(d_j, bounds), np.split(legs, bounds))}
+
+    def probe_conflicts(self, drone_id: str, legs: dict):
+        """
+        Incremental check of a trial placement: tests `legs` (a drone_legs()-style dict) for
+        `drone_id` against every committed leg of the other drones, using the persistent index.
+        Only pairs involving the trial legs are evaluated; the drone's own committed rows
+        and any parked drones are ignored.
+        """
+        table = self.table
+        d = table.drone_index.get(drone_id, -1)
+        
+        mins, maxs = self.leg_boxes(legs["A0"], legs["A1"], legs["t_start"], legs["t_end"])
+        query, rows = self.spatial_index().query_boxes(mins, maxs)
+        keep = self._committed(rows, d)
+        query, rows = query[keep], rows[keep]
+        if len(rows) == 0:
+            return []
             
-            posA_at_overlap = segA["A0"] + segA["velocity"] * t_offset_A
-            posB_at_overlap = segB["A0"] + segB["velocity"] * t_offset_B
+        return self._narrow_phase(
+            legs["A0"][query], legs["velocity"][query], legs["t_start"][query], legs["t_end"][query], np.full(len(query), d),
+            table.A0[rows], table.velocity[rows], table.t_start[rows], table.t_end[rows], table.drone_idx[rows]
+        )
+
+    def earliest_safe_delay(self, drone_id: str, max_delay: float = 600.0):
+        """
+        Smallest departure delay (s) that clears `drone_id` of every committed leg, solved in
+        closed form from the forbidden-delay interval of each candidate leg pair instead of
+        stepping and re-detecting. Returns None if no delay up to `max_delay` is clear.
+        """
+        table = self.table
+        d = table.drone_index[drone_id]
+        legs = table.drone_view(drone_id)
+        
+        # Broad phase over every delay in [0, max_delay] at once: stretch each leg's box in time
+        mins, maxs = self.leg_boxes(legs["A0"], legs["A1"], legs["t_start"], legs["t_end"])
+        maxs[:, 3] += max_delay
+        query, rows = self.spatial_index().query_boxes(mins, maxs)
+        keep = self._committed(rows, d)
+        query, rows = query[keep], rows[keep]
+        
+        lo, hi, valid = forbidden_delay_intervals(
+            legs["A0"][query], legs["velocity"][query], legs["t_start"][query], legs["t_end"][query],
+            table.A0[rows], table.velocity[rows], table.t_start[rows], table.t_end[rows],
+            self.safety_radius, self.vertical_safety_radius
+        )
+        delay = earliest_safe_delay(lo[valid], hi[valid])
+        return delay if delay <= max_delay else None
+
+    def _committed(self, rows: np.ndarray, d: int) -> np.ndarray:
+        """Mask of table rows that belong to the committed fleet as seen by drone index `d`."""
+        owner = self.table.drone_idx[rows]
+        keep = owner != d
+        if self.parked:
+            parked = np.zeros(len(self.table.drone_ids), dtype=bool)
+            parked[[self.table.drone_index[p] for p in self.parked]] = True
+            keep &= ~parked[owner]
+        return keep
+
+    def commit_drone_legs(self, drone_id: str, legs: dict):
+        """Writes a drone's new legs into the table and patches the persistent index in place."""
+        index = self.spatial_index()
+        self.table.set_drone_legs(drone_id, legs)
+        self._index_key = self._index_state()
+        self.refresh_index_rows(self.table.rows(drone_id), index)
+
+    def refresh_index_rows(self, rows: slice, index: SpatialTemporalIndex = None):
+        """Re-derives the index boxes of table rows whose contents were changed externally."""
+        index = index or self.spatial_index()
+        t = self.table
+        # Legs keep the piece count they were indexed with, so their box ids stay valid
+        mins, maxs, _ = self.index_boxes(t.A0[rows], t.A1[rows], t.t_start[rows], t.t_end[rows], index.row_pieces(rows))
+        index.update_boxes(index.row_boxes(rows), mins, maxs)
+
+    def score_placements(self, drone_id: str, legs: dict, placements: list) -> np.ndarray:
+        """
+        Batched probe of many candidate placements of one drone in a single index query.
+        `placements` is a list of (delay, shift) pairs applied to `legs` as in shifted_legs().
+        Returns a bool array, True where that placement is clear of the committed fleet.
+        """
+        table = self.table
+        d = table.drone_index.get(drone_id, -1)
+        k = len(legs["t_start"])
+        n_cand = len(placements)
+        
+        delays = np.array([p[0] for p in placements], dtype=float)
+        shifts = np.array([p[1] for p in placements], dtype=float).reshape(n_cand, 3)
+        A0 = (legs["A0"][None, :, :] + shifts[:, None, :]).reshape(-1, 3)
+        A1 = (legs["A1"][None, :, :] + shifts[:, None, :]).reshape(-1, 3)
+        np.maximum(A0[:, 2], 0.0, out=A0[:, 2])
+        np.maximum(A1[:, 2], 0.0, out=A1[:, 2])
+        t0 = (legs["t_start"][None, :] + delays[:, None]).ravel()
+        t1 = (legs["t_end"][None, :] + delays[:, None]).ravel()
+        vel = np.tile(legs["velocity"], (n_cand, 1))
+        
+        mins, maxs = self.leg_boxes(A0, A1, t0, t1)
+        query, rows = self.spatial_index().query_boxes(mins, maxs)
+        keep = self._committed(rows, d)
+        query, rows = query[keep], rows[keep]
+        
+        clear = np.ones(n_cand, dtype=bool)
+        hits = self._narrow_phase_hits(
+            A0[query], vel[query], t0[query], t1[query],
+            table.A0[rows], table.velocity[rows], table.t_start[rows], table.t_end[rows]
+        )[0]
+        clear[query[hits] // k] = False
+        return clear
+
+    def _narrow_phase_hits(self, A0_A, vel_A, t0_A, t1_A, A0_B, vel_B, t0_B, t1_B):
+        """
+        Exact dual-cylinder test over stacked candidate leg pairs (compute_los_interval_batch).
+        Returns (hits, t_conflict, min_dist_xy, dist_z, los_entry, los_exit) for the conflicting pairs.
+        The reported instant is the horizontal CPA clamped into the loss-of-separation interval.
+        """
+        overlap_start = np.maximum(t0_A, t0_B)
+        overlap_end = np.minimum(t1_A, t1_B)
+        overlapping = np.flatnonzero(overlap_start < overlap_end)
+        empty = np.empty(0)
+        if len(overlapping) == 0:
+            return overlapping, empty, empty, empty, empty, empty
             
-            # Evaluate closest horizontal approach time
-            t_cpa_rel, min_dist_xy = compute_cpa(
-                posA_at_overlap[:2], segA["velocity"][:2],
-                posB_at_overlap[:2], segB["velocity"][:2]
-            )
+        # Exact loss-of-separation interval for every candidate pair in one vectorised pass
+        conflict, los_entry, los_exit = compute_los_interval_batch(
+            A0_A[overlapping], vel_A[overlapping], t0_A[overlapping],
+            A0_B[overlapping], vel_B[overlapping], t0_B[overlapping],
+            overlap_start[overlapping], overlap_end[overlapping],
+            self.safety_radius, self.vertical_safety_radius
+        )
+        hits = np.flatnonzero(conflict)
+        if len(hits) == 0:
+            return overlapping[hits], empty, empty, empty, empty, empty
             
-            t_cpa_abs = overlap_start + t_cpa_rel
+        k = overlapping[hits]
+        los_entry, los_exit = los_entry[hits], los_exit[hits]
+        t_cpa_abs, min_dist_xy, dist_z = compute_segment_cpa_batch(
+            A0_A[k], vel_A[k], t0_A[k], A0_B[k], vel_B[k], t0_B[k], overlap_start[k], overlap_end[k]
+        )
+        
+        # Where the horizontal CPA falls outside the LoS interval, report the nearest LoS instant instead
+        outside = (t_cpa_abs < los_entry) | (t_cpa_abs > los_exit)
+        if np.any(outside):
+            t = np.clip(t_cpa_abs[outside], los_entry[outside], los_exit[outside])
+            o = k[outside]
+            D = (A0_A[o] + vel_A[o] * (t - t0_A[o])[:, None]) - (A0_B[o] + vel_B[o] * (t - t0_B[o])[:, None])
+            t_cpa_abs[outside] = t
+            min_dist_xy[outside] = np.linalg.norm(D[:, :2], axis=1)
+            dist_z[outside] = np.abs(D[:, 2])
+        return k, t_cpa_abs, min_dist_xy, dist_z, los_entry, los_exit
+
+    def _narrow_phase(self, A0_A, vel_A, t0_A, t1_A, d_A, A0_B, vel_B, t0_B, t1_B, d_B, ids: list = None):
+        """
+        Exact dual-cylinder check over stacked candidate leg pairs; returns conflict report dicts.
+        d_A / d_B index `ids` (default: the table's drone ids) for the reported drone names.
+        """
+        conflicts = []
+        k, t_cpa_abs, min_dist_xy, dist_z, los_entry, los_exit = self._narrow_phase_hits(
+            A0_A, vel_A, t0_A, t1_A, A0_B, vel_B, t0_B, t1_B
+        )
+        if len(k) == 0:
+            return conflicts
             
-            if t_cpa_abs > overlap_end:
-                t_cpa_abs = overlap_end
-                t_cpa_rel = overlap_end - overlap_start
-                posA_end_overlap = segA["A0"] + segA["velocity"] * (overlap_end - segA["t_start"])
-                posB_end_overlap = segB["A0"] + segB["velocity"] * (overlap_end - segB["t_start"])
-                min_dist_xy = np.linalg.norm(posA_end_overlap[:2] - posB_end_overlap[:2])
-                
-            # Compute exact vertical separation at the moment of minimum horizontal separation
-            z_A_at_cpa = posA_at_overlap[2] + segA["velocity"][2] * t_cpa_rel
-            z_B_at_cpa = posB_at_overlap[2] + segB["velocity"][2] * t_cpa_rel
-            dist_z = abs(z_A_at_cpa - z_B_at_cpa)
-
-            # Check Dual Cylindrical Constraints
-            if min_dist_xy < self.safety_radius and dist_z < self.vertical_safety_radius:
-                pos_conflict = segA["A0"] + segA["velocity"] * (t_cpa_abs - segA["t_start"])
-                conflicts.append({
-                    "Drone_A": segA["drone_id"],
-                    "Drone_B": segB["drone_id"],
-                    "exact_conflict_time": float(t_cpa_abs),
-                    "conflict_location": pos_conflict.tolist(),
-                    "minimum_separation": float(np.sqrt(min_dist_xy**2 + dist_z**2)),
-                    "severity": "CRITICAL" if min_dist_xy < self.safety_radius / 2 else "WARNING"
-                })
+        pos_conflict = A0_A[k] + vel_A[k] * (t_cpa_abs - t0_A[k])[:, None]
+        separation = np.sqrt(min_dist_xy**2 + dist_z**2)
+        critical = min_dist_xy < self.safety_radius / 2
+        ids = self.table.drone_ids if ids is None else ids
+        for a, b, t, loc, sep, crit, t_in, t_out in zip(d_A[k].tolist(), d_B[k].tolist(), t_cpa_abs.tolist(),
+                                                        pos_conflict.tolist(), separation.tolist(), critical.tolist(),
+                                                        los_entry.tolist(), los_exit.tolist()):
+            conflicts.append({
+                "Drone_A": ids[a],
+                "Drone_B": ids[b],
+                "exact_conflict_time": t,
+                "conflict_location": loc,
+                "minimum_separation": sep,
+                "severity": "CRITICAL" if crit else "WARNING",
+                "los_entry_time": t_in,
+                "los_exit_time": t_out
+            })
                 
         return conflicts
 
-    def auto_resolve_time_shift(self):
+    def _resolve_conflict_graph(self, conflicts: list, place_drone, max_rounds: int):
         """
-        Implementation of 4D Operational Intent Time-Shifting constraint resolution.
-        Iteratively delays the launch of conflicting drones until the 4D path volume is clear.
+        Batch resolution driven by the drone-level conflict graph.
+        Each round takes a greedy vertex cover of the graph, parks every cover drone, and
+        re-plans them one at a time with `place_drone(drone_id) -> bool` (True when the new
+        placement is clear of the committed fleet). Independent conflict clusters are thus
+        fixed in the same round. Only drones that could not be cleared are re-probed to build
+        the next round's graph, so no full-fleet detection pass is needed between rounds.
         """
-        resolutions = {}
-        max_iterations = 100
-        iteration = 0
-        
-        while iteration < max_iterations:
-            conflicts = self.detect_conflicts()
+        rank = self.table.drone_index
+        for _ in range(max_rounds):
             if not conflicts:
                 break
-                
-            # Pick the lowest priority drone to delay (e.g. Drone_B)
-            c = conflicts[0]
-            drone_to_delay = c["Drone_B"]
+            cover = greedy_vertex_cover(build_conflict_graph(conflicts), rank)
             
-            if drone_to_delay not in resolutions:
-                resolutions[drone_to_delay] = 0.0
+            self.parked = set(cover)
+            unresolved = []
+            try:
+                for drone_id in cover:
+                    self.parked.discard(drone_id)
+                    if not place_drone(drone_id):
+                        unresolved.append(drone_id)
+            finally:
+                self.parked = set()
                 
-            delay_step = 2.0 # 2 second delay per adjustment
-            resolutions[drone_to_delay] += delay_step
-            
-            # Shift all segments for the delayed drone forward in time
-            for seg in self.segments:
-                if seg["drone_id"] == drone_to_delay:
-                    seg["t_start"] += delay_step
-                    seg["t_end"] += delay_step
-                    
-            iteration += 1
+            # Re-check only the neighbourhoods of drones that still carry conflicts
+            conflicts = []
+            for drone_id in unresolved:
+                conflicts.extend(self.probe_conflicts(drone_id, self.table.drone_view(drone_id)))
+
+    def auto_resolve_time_shift(self, max_rounds: int = 20, max_delay: float = 600.0):
+        """
+        Implementation of 4D Operational Intent Time-Shifting constraint resolution.
+        Delays the launch of a vertex cover of the conflict graph until the 4D path volume is clear,
+        each by the exact earliest safe departure delay.
+        """
+        resolutions = {}
+        
+        def place_drone(drone_id):
+            delay = self.earliest_safe_delay(drone_id, max_delay)
+            clear = delay is not None
+            if not clear:
+                # No window within the horizon: push it to the end and let the next round re-check
+                delay = max_delay
+            self.commit_drone_legs(drone_id, shifted_legs(self.table.drone_legs(drone_id), delay))
+            resolutions[drone_id] = resolutions.get(drone_id, 0.0) + delay
+            return clear
             
+        self._resolve_conflict_graph(self.detect_conflicts(), place_drone, max_rounds)
         return resolutions
 
-    def auto_resolve_spatial(self):
+    def auto_resolve_spatial(self, time_delays: list = None, lateral_shifts: list = None, workers: int = None,
+                             max_rounds: int = 20):
         """
         Replaces APF physics with a Strategic 4D Pre-Flight Grid Search.
         Instead of bending physics which causes wild swinging, this searches combinations 
         of departure delays (Time Shifts) and geographic parallel offsets (Path Shifts) 
         to find the cleanest alternative flight plan that yields ZERO conflicts.
+        Drones to re-plan are chosen from the conflict graph (see _resolve_conflict_graph).
+        With workers > 1 the candidate grid is scored concurrently by a ResolverPool;
+        the chosen placement is identical to the serial path.
         """
-        if not self.segments:
+        if len(self.table) == 0:
             return {}
 
         resolutions = {}
-        
-        # 1. Group original segments by drone
-        drone_segs = {}
-        for s in self.segments:
-            d_id = s["drone_id"]
-            if d_id not in drone_segs:
-                drone_segs[d_id] = []
-            drone_segs[d_id].append(s)
-            
-        drone_ids = list(drone_segs.keys())
+        table = self.table
         
         # Grid Search parameters
-        time_delays = [0.0, 5.0, 10.0, 15.0, 20.0, 30.0]
-        lateral_shifts = [
-            np.array([0,0,0], dtype=float), 
-            np.array([40,0,0], dtype=float), np.array([-40,0,0], dtype=float), 
-            np.array([0,40,0], dtype=float), np.array([0,-40,0], dtype=float),
-            np.array([40,40,0], dtype=float), np.array([-40,-40,0], dtype=float),
-            np.array([0,0,20], dtype=float), np.array([0,0,-20], dtype=float)
-        ]
+        if time_delays is None:
+            time_delays = [0.0, 5.0, 10.0, 15.0, 20.0, 30.0]
+        if lateral_shifts is None:
+            lateral_shifts = [
+                np.array([0,0,0], dtype=float), 
+                np.array([40,0,0], dtype=float), np.array([-40,0,0], dtype=float), 
+                np.array([0,40,0], dtype=float), np.array([0,-40,0], dtype=float),
+                np.array([40,40,0], dtype=float), np.array([-40,-40,0], dtype=float),
+                np.array([0,0,20], dtype=float), np.array([0,0,-20], dtype=float)
+            ]
+        placements = [(float(delay), np.asarray(shift, dtype=float)) for delay in time_delays for shift in lateral_shifts]
+        # Cost function: prefer minimal shift and delay
+        costs = np.array([delay * 2.0 + np.linalg.norm(shift) for delay, shift in placements])
         
-        max_iterations = 20
-        iteration = 0
+        pool = ResolverPool(self, workers) if workers and workers > 1 else None
+        score_placements = pool.score_placements if pool else self.score_placements
         
-        while iteration < max_iterations:
-            conflicts = self.detect_conflicts()
-            if not conflicts:
-                break
-                
-            # Pick the lowest priority drone to reroute
-            c = conflicts[0]
-            drone_to_fix = c["Drone_B"]
+        def place_drone(drone_to_fix):
+            original_drone_legs = table.drone_legs(drone_to_fix)
             
-            best_cost = float('inf')
-            best_segs = None
-            best_shift = None
-            best_delay = None
+            # Probe every candidate placement against the committed fleet
+            clear = np.flatnonzero(score_placements(drone_to_fix, original_drone_legs, placements))
             
-            if drone_to_fix not in drone_segs:
-                break
-                
-            original_drone_legs = [s.copy() for s in drone_segs[drone_to_fix]]
-            
-            # Temporarily remove this drone's segments from the checker
-            self.segments = [s for s in self.segments if s["drone_id"] != drone_to_fix]
-            
-            for delay in time_delays:
-                for shift in lateral_shifts:
-                    test_segs = []
-                    for s in original_drone_legs:
-                        new_s = s.copy()
-                        new_s["A0"] = s["A0"] + shift
-                        new_s["A1"] = s["A1"] + shift
-                        new_s["t_start"] = s["t_start"] + delay
-                        new_s["t_end"] = s["t_end"] + delay
-                        
-                        # Floor clamping
-                        if new_s["A0"][2] < 0: new_s["A0"][2] = 0.0
-                        if new_s["A1"][2] < 0: new_s["A1"][2] = 0.0
-                            
-                        test_segs.append(new_s)
-                    
-                    # Test integration
-                    self.segments.extend(test_segs)
-                    test_conflicts = self.detect_conflicts()
-                    # Remove it back out
-                    self.segments = self.segments[:-len(test_segs)]
-                    
-                    # Check if the drone being evaluated remains uncollided
-                    drone_is_clear = True
-                    for tc in test_conflicts:
-                        if tc["Drone_A"] == drone_to_fix or tc["Drone_B"] == drone_to_fix:
-                            drone_is_clear = False
-                            break
-                            
-                    if drone_is_clear:
-                        # Cost function: prefer minimal shift and delay
-                        cost = delay * 2.0 + np.linalg.norm(shift)
-                        if cost < best_cost:
-                            best_cost = cost
-                            best_segs = test_segs
-                            best_shift = shift
-                            best_delay = delay
-                            
-            if best_segs is not None:
-                self.segments.extend(best_segs)
-                drone_segs[drone_to_fix] = best_segs
+            if len(clear):
+                # First lowest-cost clear placement, in grid order
+                best = clear[np.argmin(costs[clear])]
+                best_delay, best_shift = placements[best]
+                self.commit_drone_legs(drone_to_fix, shifted_legs(original_drone_legs, best_delay, best_shift))
                 
                 # Setup resolution report info
                 resolutions[drone_to_fix] = {
@@ -262,36 +611,51 @@ class OfflineBatchChecker:
                     "lateral_shift_x": float(best_shift[0]),
                     "lateral_shift_y": float(best_shift[1]),
                     "alt_shift_z": float(best_shift[2]),
-                    "cost": float(best_cost)
+                    "cost": float(costs[best])
                 }
             else:
                 # Fallback: Just force a huge delay so it flies *after*
-                fallback_segs = []
-                for s in original_drone_legs:
-                    new_s = s.copy()
-                    new_s["t_start"] += 45.0
-                    new_s["t_end"] += 45.0
-                    fallback_segs.append(new_s)
-                self.segments.extend(fallback_segs)
-                drone_segs[drone_to_fix] = fallback_segs
+                self.commit_drone_legs(drone_to_fix, shifted_legs(original_drone_legs, 45.0))
                 if drone_to_fix not in resolutions:
                     resolutions[drone_to_fix] = {"fallback_delay": 0.0}
                 if "fallback_delay" in resolutions[drone_to_fix]:
                     resolutions[drone_to_fix]["fallback_delay"] += 45.0
                 else:
                     resolutions[drone_to_fix]["fallback_delay"] = 45.0
-            
-            iteration += 1
+                    
+            if pool:
+                pool.publish(drone_to_fix)
+            return len(clear) > 0
+        
+        try:
+            self._resolve_conflict_graph(self.detect_conflicts(), place_drone, max_rounds)
+        finally:
+            if pool:
+                pool.close()
             
         return {"method": "Grid Search Parallel Path & Time", "status": "Rerouted securely without physics wobbly artifacts.", "details": resolutions}
 
-    def run_pipeline(self, input_filepath: str, output_filepath: str):
-        self.parse_mission_file(input_filepath)
-        conflicts = self.detect_conflicts()
+    def run_pipeline(self, input_filepath: str, output_filepath: str, workers: int = None, shard_by: str = "time",
+                     output_format: str = None):
+        # Columnar stores (directories) skip parsing/pretty-printing entirely; JSON paths behave as before.
+        # The report is written as output_format ("columnar" or "json"), by default in the input's format
+        columnar_input = is_columnar(input_filepath)
+        if output_format is None:
+            output_format = "columnar" if columnar_input else "json"
+        if output_format not in ("columnar", "json"):
+            raise ValueError(f"output_format must be 'columnar' or 'json', got {output_format!r}")
+        if columnar_input:
+            self.load_columnar(input_filepath)
+        else:
+            self.stream_mission_file(input_filepath)
+        conflicts = self.detect_conflicts(workers, shard_by)
         
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'w') as f:
-            json.dump(conflicts, f, indent=4)
+        if output_format == "columnar":
+            save_report(conflicts, output_filepath)
+        else:
+            os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
+            with open(output_filepath, 'w') as f:
+                json.dump(conflicts, f, indent=4)
         print(f"Mode 1 Batch Check Complete. Found {len(conflicts)} conflicts. Report: {output_filepath}")
         
 if __name__ == "__main__":
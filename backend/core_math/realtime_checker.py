@@ -1,11 +1,22 @@
 import numpy as np
 import copy
-from .cpa import compute_cpa
+from .cpa import compute_cpa_batch
 from ..spatial.h3_grid import RealTimeSpatialHash
+from ..spatial.uniform_grid import UniformGrid
+from ..spatial.swept_volume import SweptVolumeIndex
 
 class RealTimeATC:
-    def __init__(self, telemetry_engine):
+    BROAD_PHASES = ("h3", "grid", "swept", "incremental")
+    LOOKAHEAD = 60.0  # seconds; CPAs further ahead are not reported
+
+    def __init__(self, telemetry_engine, broad_phase: str = "h3"):
+        if broad_phase not in self.BROAD_PHASES:
+            raise ValueError(f"broad_phase must be one of {self.BROAD_PHASES}, got {broad_phase!r}")
         self.te = telemetry_engine
+        self.broad_phase = broad_phase
+        if broad_phase == "incremental":
+            # The telemetry engine only pays for the persistent grid when a checker reads it
+            telemetry_engine.track_spatial()
         self.active_ras = {} # Drone_ID -> RA info
         
     def monitor_airspace(self):
@@ -13,55 +24,78 @@ class RealTimeATC:
         Runs continuously on the latest state to identify real-time conflicts
         and generate RAs.
         """
-        states = self.te.get_latest_state()
-        if not states:
+        # The telemetry lock keeps other threads from rewriting state rows mid-check
+        with self.te.lock:
+            return self._check(self.te.state_view())
+            
+    def _check(self, table) -> list:
+        if len(table) == 0:
             return []
+        ids = table.drone_ids
+        pos, vel, radius = table.position, table.velocity, table.radius
             
         # 1. Broad phase
-        grid = RealTimeSpatialHash(resolution=10)
-        for d_id, state in states.items():
-            grid.insert_drone(d_id, state["x"], state["y"], state["uncertainty_radius"])
+        idx_A, idx_B = self.candidate_pairs(table)
+        
+        if len(idx_A) == 0:
+            return []
             
-        candidates = grid.get_candidate_pairs()
+        # 2. Continuous Decision Layer (all candidate pairs in one vectorised CPA pass)
+        t_cpa, min_dist = compute_cpa_batch(pos[idx_A], vel[idx_A], pos[idx_B], vel[idx_B])
+        combo_radius = radius[idx_A] + radius[idx_B]
+        
+        hits = np.flatnonzero((min_dist < combo_radius) & (t_cpa >= 0) & (t_cpa < self.LOOKAHEAD))
         
-        # 2. Continuous Decision Layer
         conflicts = []
-        for id_A, id_B in candidates:
-            stA = states[id_A]
-            stB = states[id_B]
+        for k in hits:
+            a, b = idx_A[k], idx_B[k]
+            if ids[a] > ids[b]:
+                a, b = b, a  # report pairs in id order whichever broad phase found them
+            id_A, id_B = ids[a], ids[b]
+            stA = table.record(a)
+            stB = table.record(b)
             
-            p0_A = np.array([stA["x"], stA["y"], stA["z"]])
-            v_A = np.array([stA["vx"], stA["vy"], stA["vz"]])
+            # Severity analysis
+            sev = "CRITICAL" if min_dist[k] < combo_radius[k] * 0.5 else "WARNING"
             
-            p0_B = np.array([stB["x"], stB["y"], stB["z"]])
-            v_B = np.array([stB["vx"], stB["vy"], stB["vz"]])
+            # Check for RAs (for controlled drones only)
+            ra = None
+            if stA["type"] == "controlled" and stB["type"] == "bogie":
+                ra = self.generate_resolution(stA, stB, t_cpa[k], min_dist[k], combo_radius[k])
+            elif stB["type"] == "controlled" and stA["type"] == "bogie":
+                ra = self.generate_resolution(stB, stA, t_cpa[k], min_dist[k], combo_radius[k])
             
-            t_cpa, min_dist = compute_cpa(p0_A, v_A, p0_B, v_B)
-            
-            combo_radius = stA["uncertainty_radius"] + stB["uncertainty_radius"]
-            
-            if min_dist < combo_radius and t_cpa >= 0 and t_cpa < 60.0:
-                # Severity analysis
-                sev = "CRITICAL" if min_dist < combo_radius * 0.5 else "WARNING"
-                
-                # Check for RAs (for controlled drones only)
-                ra = None
-                if stA["type"] == "controlled" and stB["type"] == "bogie":
-                    ra = self.generate_resolution(stA, stB, t_cpa, min_dist, combo_radius)
-                elif stB["type"] == "controlled" and stA["type"] == "bogie":
-                    ra = self.generate_resolution(stB, stA, t_cpa, min_dist, combo_radius)
-                
-                conflicts.append({
-                    "id_A": id_A,
-                    "id_B": id_B,
-                    "min_dist": min_dist,
-                    "t_cpa": t_cpa,
-                    "severity": sev,
-                    "ra": ra
-                })
+            conflicts.append({
+                "id_A": id_A,
+                "id_B": id_B,
+                "min_dist": float(min_dist[k]),
+                "t_cpa": float(t_cpa[k]),
+                "severity": sev,
+                "ra": ra
+            })
                 
         return conflicts
         
+    def candidate_pairs(self, table) -> tuple:
+        """Broad phase over a StateTable: (idx_A, idx_B) row arrays of the candidate pairs."""
+        pos, radius = table.position, table.radius
+        if self.broad_phase == "grid":
+            pairs = UniformGrid().candidate_index_pairs(pos[:, :2], radius)
+            return pairs[:, 0], pairs[:, 1]
+        if self.broad_phase == "incremental":
+            # Maintained by the telemetry engine as packets arrive; only changed drones are re-examined
+            pairs = self.te.spatial.candidate_index_pairs()
+            return pairs[:, 0], pairs[:, 1]
+        if self.broad_phase == "swept":
+            pairs = SweptVolumeIndex(self.LOOKAHEAD).candidate_index_pairs(pos, table.velocity, radius)
+            return pairs[:, 0], pairs[:, 1]
+        # Inserted in row order, so the hash's drone slots are the table rows
+        grid = RealTimeSpatialHash(resolution=10)
+        for d_id, (x, y), r in zip(table.drone_ids, pos[:, :2].tolist(), radius.tolist()):
+            grid.insert_drone(d_id, x, y, r)
+        pairs = grid.get_candidate_index_pairs()
+        return pairs[:, 0], pairs[:, 1]
+        
     def generate_resolution(self, controlled_state, bogie_state, t_cpa, min_dist, combo_radius):
         """
         Generates a delay advisory (e.g. Pause for X seconds).
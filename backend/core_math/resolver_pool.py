@@ -0,0 +1,102 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from .segment_table import SegmentTable
+
+# Per-process state of a pool worker: its shared-memory handles and a private checker
+_worker = {}
+
+def _attach_columns(spec: list):
+    handles, columns = [], {}
+    for name, shm_name, shape, dtype in spec:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        handles.append(shm)
+        columns[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return handles, columns
+
+def share_columns(table: SegmentTable) -> tuple:
+    """
+    Copies a table's columns into fresh shared-memory blocks.
+    Returns (handles, views, spec); `spec` is what pool workers pass to _init_worker to attach.
+    """
+    handles, views, spec = [], {}, []
+    for name, col in table.columns().items():
+        shm = shared_memory.SharedMemory(create=True, size=max(1, col.nbytes))
+        view = np.ndarray(col.shape, dtype=col.dtype, buffer=shm.buf)
+        view[:] = col
+        handles.append(shm)
+        views[name] = view
+        spec.append((name, shm.name, col.shape, col.dtype.str))
+    return handles, views, spec
+
+def release_columns(handles: list):
+    for shm in handles:
+        shm.close()
+        shm.unlink()
+
+def _init_worker(spec: list, drone_ids: list, safety_radius: float, vertical_safety_radius: float,
+                 max_leg_pieces: int = 1, max_box_ratio: float = None):
+    from .offline_checker import OfflineBatchChecker
+    handles, columns = _attach_columns(spec)
+    checker = OfflineBatchChecker(safety_radius, vertical_safety_radius, max_leg_pieces, max_box_ratio)
+    checker.table = SegmentTable.from_columns(columns, drone_ids)
+    _worker.update(handles=handles, checker=checker, applied=0)
+
+def _score_chunk(updates: list, parked: list, drone_id: str, legs: dict, placements: list) -> np.ndarray:
+    checker = _worker["checker"]
+    checker.parked = set(parked)
+    # Patch this worker's index with every commit it has not seen yet
+    for start, stop in updates[_worker["applied"]:]:
+        checker.refresh_index_rows(slice(start, stop))
+    _worker["applied"] = len(updates)
+    return checker.score_placements(drone_id, legs, placements)
+
+class ResolverPool:
+    """
+    Process pool that scores spatial-resolver placements concurrently.
+    The committed segment table is mirrored once into shared memory and read (never written)
+    by every worker. Each commit is published as a row range that workers re-index lazily.
+    """
+    def __init__(self, checker, workers: int):
+        table = checker.table
+        self.checker = checker
+        self.workers = workers
+        self.updates = []
+        self._handles, self._columns, spec = share_columns(table)
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(spec, table.drone_ids, checker.safety_radius, checker.vertical_safety_radius,
+                      checker.max_leg_pieces, checker.max_box_ratio)
+        )
+
+    def score_placements(self, drone_id: str, legs: dict, placements: list) -> np.ndarray:
+        """Parallel equivalent of OfflineBatchChecker.score_placements (same result order)."""
+        chunks = [c for c in np.array_split(np.arange(len(placements)), self.workers) if len(c)]
+        futures = [
+            self.executor.submit(_score_chunk, self.updates, sorted(self.checker.parked), drone_id, legs,
+                                 [placements[i] for i in chunk])
+            for chunk in chunks
+        ]
+        return np.concatenate([f.result() for f in futures])
+
+    def publish(self, drone_id: str):
+        """Copies a drone's committed rows into shared memory. Call only while no scoring is in flight."""
+        table = self.checker.table
+        r = table.rows(drone_id)
+        for name, col in table.columns().items():
+            self._columns[name][r] = col[r]
+        self.updates.append((r.start, r.stop))
+
+    def close(self):
+        self.executor.shutdown()
+        self._columns.clear()
+        release_columns(self._handles)
+        self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
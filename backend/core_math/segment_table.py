@@ -0,0 +1,252 @@
+import numpy as np
+
+class SegmentTable:
+    """
+    Columnar (structure-of-arrays) store for piecewise-linear mission legs.
+    Row k is one leg flown from A0[k] to A1[k] at constant velocity[k] over
+    [t_start[k], t_end[k]] by drone drone_ids[drone_idx[k]].
+    Legs of one drone are always stored contiguously, so per-drone access is a slice view.
+    """
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        self._A0 = np.empty((capacity, 3), dtype=float)
+        self._A1 = np.empty((capacity, 3), dtype=float)
+        self._velocity = np.empty((capacity, 3), dtype=float)
+        self._t_start = np.empty(capacity, dtype=float)
+        self._t_end = np.empty(capacity, dtype=float)
+        self._drone_idx = np.empty(capacity, dtype=np.int32)
+        self.n = 0
+
+        # Drone lookup table: integer id <-> string id, plus each drone's row range
+        self.drone_ids = []
+        self.drone_index = {}
+        self._row_range = []
+
+        # Bumped on every mutation so derived structures (indexes, caches) can detect staleness
+        self.version = 0
+
+    def __len__(self):
+        return self.n
+
+    # Zero-copy column views over the live rows
+    @property
+    def A0(self): return self._A0[:self.n]
+    @property
+    def A1(self): return self._A1[:self.n]
+    @property
+    def velocity(self): return self._velocity[:self.n]
+    @property
+    def t_start(self): return self._t_start[:self.n]
+    @property
+    def t_end(self): return self._t_end[:self.n]
+    @property
+    def drone_idx(self): return self._drone_idx[:self.n]
+
+    def _reserve(self, extra: int):
+        needed = self.n + extra
+        capacity = len(self._t_start)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_A0", "_A1", "_velocity", "_t_start", "_t_end", "_drone_idx"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append_legs(self, drone_id: str, A0: np.ndarray, A1: np.ndarray, velocity: np.ndarray,
+                    t_start: np.ndarray, t_end: np.ndarray):
+        """Appends k legs of one drone in bulk. All inputs are (k, 3) or (k,) arrays."""
+        k = len(t_start)
+        if k == 0:
+            return
+        d = self.drone_index.get(drone_id)
+        if d is None:
+            d = len(self.drone_ids)
+            self.drone_ids.append(drone_id)
+            self.drone_index[drone_id] = d
+            self._row_range.append((self.n, self.n))
+
+        start, stop = self._row_range[d]
+        if stop != self.n:
+            # Keep the drone's legs contiguous: rotate its existing block to the tail first
+            self._move_to_tail(d)
+            start, stop = self._row_range[d]
+
+        self._reserve(k)
+        rows = slice(self.n, self.n + k)
+        self._A0[rows] = A0
+        self._A1[rows] = A1
+        self._velocity[rows] = velocity
+        self._t_start[rows] = t_start
+        self._t_end[rows] = t_end
+        self._drone_idx[rows] = d
+        self.n += k
+        self._row_range[d] = (start, self.n)
+        self.version += 1
+
+    def append_batch(self, drone_ids: list, counts: np.ndarray, A0: np.ndarray, A1: np.ndarray,
+                     velocity: np.ndarray, t_start: np.ndarray, t_end: np.ndarray):
+        """
+        Appends the legs of several drones with one copy per column.
+        Rows are grouped by drone in order: the first counts[0] rows belong to drone_ids[0], etc.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        if any(d_id in self.drone_index for d_id in drone_ids) or len(set(drone_ids)) != len(drone_ids):
+            # Drones seen before must stay contiguous, which the per-drone path handles
+            bounds = np.cumsum(counts)[:-1]
+            for d_id, a0, a1, v, ts, te in zip(drone_ids, *(np.split(c, bounds) for c in (A0, A1, velocity, t_start, t_end))):
+                self.append_legs(d_id, a0, a1, v, ts, te)
+            return
+
+        keep = counts > 0
+        drone_ids = [d_id for d_id, k in zip(drone_ids, keep.tolist()) if k]
+        counts = counts[keep]
+        k = int(counts.sum())
+        if k == 0:
+            return
+
+        self._reserve(k)
+        rows = slice(self.n, self.n + k)
+        first = len(self.drone_ids)
+        self._A0[rows] = A0
+        self._A1[rows] = A1
+        self._velocity[rows] = velocity
+        self._t_start[rows] = t_start
+        self._t_end[rows] = t_end
+        self._drone_idx[rows] = np.repeat(np.arange(first, first + len(drone_ids)), counts)
+
+        stops = self.n + np.cumsum(counts)
+        for d_id, start, stop in zip(drone_ids, (stops - counts).tolist(), stops.tolist()):
+            self.drone_index[d_id] = len(self.drone_ids)
+            self.drone_ids.append(d_id)
+            self._row_range.append((start, stop))
+        self.n += k
+        self.version += 1
+
+    def _move_to_tail(self, d: int):
+        start, stop = self._row_range[d]
+        order = np.r_[0:start, stop:self.n, start:stop]
+        for name in ("_A0", "_A1", "_velocity", "_t_start", "_t_end", "_drone_idx"):
+            col = getattr(self, name)
+            col[:self.n] = col[order]
+        k = stop - start
+        for other, (s, e) in enumerate(self._row_range):
+            if s >= stop:
+                self._row_range[other] = (s - k, e - k)
+        self._row_range[d] = (self.n - k, self.n)
+
+    def remove_drone_legs(self, drone_id: str):
+        """Drops every leg of a drone (it keeps its integer id, with an empty row range)."""
+        d = self.drone_index.get(drone_id)
+        if d is None:
+            return
+        start, stop = self._row_range[d]
+        if start == stop:
+            return
+        if stop != self.n:
+            self._move_to_tail(d)
+        self.n -= stop - start
+        self._row_range[d] = (self.n, self.n)
+        self.version += 1
+
+    def rows(self, drone_id: str) -> slice:
+        """Row slice of a drone's legs (empty slice if unknown)."""
+        d = self.drone_index.get(drone_id)
+        if d is None:
+            return slice(0, 0)
+        start, stop = self._row_range[d]
+        return slice(start, stop)
+
+    def drone_view(self, drone_id: str) -> dict:
+        """Zero-copy column views of one drone's legs."""
+        r = self.rows(drone_id)
+        return {
+            "A0": self._A0[r], "A1": self._A1[r], "velocity": self._velocity[r],
+            "t_start": self._t_start[r], "t_end": self._t_end[r]
+        }
+
+    def drone_legs(self, drone_id: str) -> dict:
+        """Independent copy of one drone's legs, safe to keep across in-place updates."""
+        return {k: v.copy() for k, v in self.drone_view(drone_id).items()}
+
+    def set_drone_legs(self, drone_id: str, legs: dict):
+        """Overwrites a drone's legs in place. The leg count must not change."""
+        r = self.rows(drone_id)
+        self._A0[r] = legs["A0"]
+        self._A1[r] = legs["A1"]
+        self._velocity[r] = legs["velocity"]
+        self._t_start[r] = legs["t_start"]
+        self._t_end[r] = legs["t_end"]
+        self.version += 1
+
+    def records(self) -> list:
+        """Row-wise dict view in the legacy `segments` format (A0/A1/velocity as ndarrays)."""
+        ids = self.drone_ids
+        return [{
+            "drone_id": ids[d],
+            "A0": a0, "A1": a1, "velocity": v,
+            "t_start": ts, "t_end": te
+        } for d, a0, a1, v, ts, te in zip(self.drone_idx.tolist(), self.A0.copy(), self.A1.copy(),
+                                           self.velocity.copy(), self.t_start.tolist(), self.t_end.tolist())]
+
+    def to_json(self) -> list:
+        """JSON-ready row records (plain lists and floats), built from whole columns at once."""
+        ids = self.drone_ids
+        return [{
+            "drone_id": ids[d],
+            "A0": a0, "A1": a1, "velocity": v,
+            "t_start": ts, "t_end": te
+        } for d, a0, a1, v, ts, te in zip(self.drone_idx.tolist(), self.A0.tolist(), self.A1.tolist(),
+                                           self.velocity.tolist(), self.t_start.tolist(), self.t_end.tolist())]
+
+    def columns(self) -> dict:
+        """Live column views keyed by column name, e.g. for mirroring into shared memory."""
+        return {
+            "A0": self.A0, "A1": self.A1, "velocity": self.velocity,
+            "t_start": self.t_start, "t_end": self.t_end, "drone_idx": self.drone_idx
+        }
+
+    @classmethod
+    def from_columns(cls, columns: dict, drone_ids: list) -> "SegmentTable":
+        """
+        Wraps existing column arrays (as returned by columns()) without copying them.
+        Rows must already be grouped contiguously by drone; appending later reallocates and detaches the table.
+        """
+        table = cls(capacity=1)
+        table._A0 = columns["A0"]
+        table._A1 = columns["A1"]
+        table._velocity = columns["velocity"]
+        table._t_start = columns["t_start"]
+        table._t_end = columns["t_end"]
+        table._drone_idx = columns["drone_idx"]
+        table.n = len(table._t_start)
+        table.drone_ids = list(drone_ids)
+        table.drone_index = {d_id: i for i, d_id in enumerate(table.drone_ids)}
+
+        bounds = np.flatnonzero(np.diff(table._drone_idx)) + 1
+        starts = np.concatenate(([0], bounds)).tolist() if table.n else []
+        stops = np.concatenate((bounds, [table.n])).tolist() if table.n else []
+        table._row_range = [(0, 0)] * len(table.drone_ids)
+        for start, stop in zip(starts, stops):
+            table._row_range[int(table._drone_idx[start])] = (start, stop)
+        return table
+
+    @classmethod
+    def from_records(cls, segments: list) -> "SegmentTable":
+        """Builds a table from legacy per-leg segment dicts."""
+        table = cls(capacity=len(segments))
+        by_drone = {}
+        for s in segments:
+            by_drone.setdefault(s["drone_id"], []).append(s)
+        for drone_id, legs in by_drone.items():
+            table.append_legs(
+                drone_id,
+                np.array([s["A0"] for s in legs], dtype=float),
+                np.array([s["A1"] for s in legs], dtype=float),
+                np.array([s["velocity"] for s in legs], dtype=float),
+                np.array([s["t_start"] for s in legs], dtype=float),
+                np.array([s["t_end"] for s in legs], dtype=float)
+            )
+        return table
@@ -0,0 +1,161 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .resolver_pool import share_columns, release_columns, _init_worker, _worker
+from ..spatial.rtree_filter import SpatialTemporalIndex
+
+def _quantile_bounds(values: np.ndarray, count: int) -> list:
+    """Open-ended shard boundaries at quantiles of `values`: [-inf, q1, ..., inf]."""
+    inner = np.unique(np.quantile(values, np.linspace(0.0, 1.0, count + 1)[1:-1])) if count > 1 else []
+    return [-np.inf] + list(map(float, inner)) + [np.inf]
+
+def time_slabs(table, count: int) -> list:
+    """`count` half-open time slabs [lo, hi) holding similar numbers of legs."""
+    bounds = _quantile_bounds((table.t_start + table.t_end) / 2, count)
+    return [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+def spatial_tiles(table, count: int) -> list:
+    """
+    About `count` half-open x/y tiles (x_lo, x_hi, y_lo, y_hi) holding similar numbers of legs:
+    columns split at quantiles of the legs' low x, then each column at quantiles of its own low y,
+    so clustered traffic is not left in a few tiles of a global grid. Low corners are used because
+    pairs are owned where their boxes start (see owned_pairs).
+    """
+    low = np.minimum(table.A0, table.A1)
+    side = max(1, int(np.ceil(np.sqrt(count))))
+    xs = _quantile_bounds(low[:, 0], side)
+    tiles = []
+    for x_lo, x_hi in zip(xs[:-1], xs[1:]):
+        column = low[(low[:, 0] >= x_lo) & (low[:, 0] < x_hi), 1]
+        ys = _quantile_bounds(column, side) if len(column) else [-np.inf, np.inf]
+        tiles += [(x_lo, x_hi, y_lo, y_hi) for y_lo, y_hi in zip(ys[:-1], ys[1:])]
+    return tiles
+
+def owned_pairs(pairs: np.ndarray, boxes: tuple, mode: str, shard: tuple) -> np.ndarray:
+    """
+    The leg pairs of `pairs` that belong to `shard`. A pair belongs to the shard holding the start of
+    its first overlapping box pair (in box order): max(mins_t) of the two boxes in time mode, and
+    (max(mins_x), max(mins_y)) in space mode. Both boxes reach that point, so the owning shard always
+    finds the pair, and no other shard keeps it.
+    """
+    if len(pairs) == 0:
+        return pairs
+    mins, maxs, parent = boxes
+    first = np.searchsorted(parent, np.arange(int(parent[-1]) + 2))
+    a, b = pairs[:, 0], pairs[:, 1]
+    pieces_b = first[b + 1] - first[b]
+    combos = (first[a + 1] - first[a]) * pieces_b
+    if np.all(combos == 1):
+        p, q = first[a], first[b]
+    else:
+        # 1. Every box pair of every leg pair, flattened in (p, q) order
+        pair = np.repeat(np.arange(len(pairs)), combos)
+        k = np.arange(len(pair)) - np.repeat(np.cumsum(combos) - combos, combos)
+        p = first[a][pair] + k // pieces_b[pair]
+        q = first[b][pair] + k % pieces_b[pair]
+        # 2. First overlapping one per leg pair (every candidate has at least one)
+        hit = np.flatnonzero(np.all((mins[p] <= maxs[q]) & (mins[q] <= maxs[p]), axis=1))
+        hit = hit[np.r_[True, pair[hit][1:] != pair[hit][:-1]]]
+        p, q = p[hit], q[hit]
+    start = np.maximum(mins[p], mins[q])
+    if mode == "time":
+        lo, hi = shard
+        return pairs[(start[:, 3] >= lo) & (start[:, 3] < hi)]
+    x_lo, x_hi, y_lo, y_hi = shard
+    return pairs[(start[:, 0] >= x_lo) & (start[:, 0] < x_hi) & (start[:, 1] >= y_lo) & (start[:, 1] < y_hi)]
+
+def shard_conflict_pairs(checker, boxes: tuple, mode: str, shard: tuple) -> tuple:
+    """
+    Conflicting leg pairs (table rows, i < j) owned by one shard, plus its candidate count.
+    `boxes` are the checker's index_boxes() over the whole table. The shard indexes every box
+    that reaches into it, so legs near a boundary are seen by each neighbour, but only the pairs
+    that owned_pairs() assigns to this shard are narrow-phased: every pair is checked exactly once.
+    """
+    table = checker.table
+    mins, maxs, parent = boxes
+    if mode == "time":
+        lo, hi = shard
+        sel = (mins[:, 3] < hi) & (maxs[:, 3] >= lo)
+    else:
+        x_lo, x_hi, y_lo, y_hi = shard
+        sel = (mins[:, 0] < x_hi) & (maxs[:, 0] >= x_lo) & (mins[:, 1] < y_hi) & (maxs[:, 1] >= y_lo)
+    sel = np.flatnonzero(sel)
+    if len(sel) < 2:
+        return np.empty((0, 2), dtype=np.int64), 0
+
+    index = SpatialTemporalIndex.from_boxes(mins[sel], maxs[sel], table.drone_idx[parent[sel]], parent=parent[sel])
+    # A box pair starts where its later box starts, so the shard only joins pairs that start inside it
+    if mode == "time":
+        pairs = index.self_join(np.flatnonzero(mins[sel, 3] >= shard[0]))
+    else:
+        # Boxes starting inside in x and y meet every box; ones starting inside in x only need
+        # a partner starting inside in y only
+        in_x, in_y = mins[sel, 0] >= shard[0], mins[sel, 1] >= shard[2]
+        pairs = index.self_join(np.flatnonzero(in_x & in_y))
+        only_x, only_y = sel[in_x & ~in_y], sel[in_y & ~in_x]
+        if len(only_x) and len(only_y):
+            other = SpatialTemporalIndex.from_boxes(mins[only_y], maxs[only_y], table.drone_idx[parent[only_y]],
+                                                    parent=parent[only_y])
+            query, b = other.query_boxes(mins[only_x], maxs[only_x])
+            a = parent[only_x][query]
+            keep = table.drone_idx[a] != table.drone_idx[b]
+            a, b = a[keep], b[keep]
+            pairs = np.unique(np.concatenate((pairs, np.column_stack((np.minimum(a, b), np.maximum(a, b))))), axis=0)
+    pairs = owned_pairs(pairs, boxes, mode, shard)
+    if len(pairs) == 0:
+        return pairs, 0
+
+    a, b = pairs[:, 0], pairs[:, 1]
+    hits = checker._narrow_phase_hits(
+        table.A0[a], table.velocity[a], table.t_start[a], table.t_end[a],
+        table.A0[b], table.velocity[b], table.t_start[b], table.t_end[b]
+    )[0]
+    return pairs[hits], len(pairs)
+
+def _shard_task(mode: str, shard: tuple) -> tuple:
+    checker = _worker["checker"]
+    if "boxes" not in _worker:
+        t = checker.table
+        _worker["boxes"] = checker.index_boxes(t.A0, t.A1, t.t_start, t.t_end)
+    return shard_conflict_pairs(checker, _worker["boxes"], mode, shard)
+
+def sharded_conflict_pairs(checker, workers: int, mode: str = "time", shards_per_worker: int = 4) -> np.ndarray:
+    """
+    Conflicting leg pairs of the whole table, split into shards checked on a process pool:
+    time slabs (mode="time") or geographic x/y tiles (mode="space"), each narrow-phasing only the
+    candidate pairs it owns. The table is shared with the workers through shared memory; their row
+    pairs are merged and sorted exactly like the serial self-join.
+    `last_stats["candidates"]` counts the narrow-phased candidates, which match the serial count.
+    """
+    table = checker.table
+    if table.n == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    count = max(1, workers * shards_per_worker)
+    shards = time_slabs(table, count) if mode == "time" else spatial_tiles(table, count)
+
+    if workers <= 1:
+        boxes = checker.index_boxes(table.A0, table.A1, table.t_start, table.t_end)
+        results = [shard_conflict_pairs(checker, boxes, mode, shard) for shard in shards]
+    else:
+        handles, _, spec = share_columns(table)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(spec, table.drone_ids, checker.safety_radius, checker.vertical_safety_radius,
+                          checker.max_leg_pieces, checker.max_box_ratio)
+            ) as executor:
+                results = list(executor.map(_shard_task, [mode] * len(shards), shards))
+        finally:
+            release_columns(handles)
+
+    # Shards own disjoint pairs, so merging is a plain sort into the serial order
+    pairs = np.concatenate([r[0] for r in results])
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    checker.last_stats = {"legs": len(table), "shards": len(shards),
+                          "candidates": sum(r[1] for r in results), "conflicts": len(pairs)}
+    return pairs
+
+def detect_conflicts_sharded(checker, workers: int, mode: str = "time", shards_per_worker: int = 4) -> list:
+    """detect_conflicts() over sharded_conflict_pairs(); the report matches the serial path exactly."""
+    return checker.conflict_report(sharded_conflict_pairs(checker, workers, mode, shards_per_worker))
@@ -0,0 +1,118 @@
+import numpy as np
+
+class StateTable:
+    """
+    Latest known state of every tracked drone, kept as contiguous columns that are updated in place
+    as telemetry is applied: position (N, 3), velocity (N, 3), uncertainty radius (N,) and kind (N,),
+    an index into KINDS. Rows are dense, so the properties below are zero-copy views of rows [0, n).
+    A drone keeps its row until it is removed; the last row then moves into the freed one.
+    """
+    KINDS = ("controlled", "bogie")
+    _COLUMNS = (("_position", (3,), float), ("_velocity", (3,), float),
+                ("_radius", (), float), ("_kind", (), np.int8))
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        for name, shape, dtype in self._COLUMNS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        self.n = 0
+        # Row -> drone id and drone id -> row
+        self.drone_ids = []
+        self.slot = {}
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, drone_id: str):
+        return drone_id in self.slot
+
+    @property
+    def position(self) -> np.ndarray:
+        return self._position[:self.n]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity[:self.n]
+
+    @property
+    def radius(self) -> np.ndarray:
+        return self._radius[:self.n]
+
+    @property
+    def kind(self) -> np.ndarray:
+        return self._kind[:self.n]
+
+    def slots_for(self, drone_ids: list) -> np.ndarray:
+        """Rows of `drone_ids`, appending a row for each drone not seen before."""
+        slot = self.slot
+        new = [d for d in dict.fromkeys(drone_ids) if d not in slot]
+        if new:
+            capacity = len(self._radius)
+            if self.n + len(new) > capacity:
+                new_capacity = max(2 * capacity, self.n + len(new))
+                for name, shape, dtype in self._COLUMNS:
+                    old = getattr(self, name)
+                    grown = np.zeros((new_capacity,) + shape, dtype=dtype)
+                    grown[:capacity] = old
+                    setattr(self, name, grown)
+            for d in new:
+                slot[d] = self.n
+                self.drone_ids.append(d)
+                self.n += 1
+        return np.array([slot[d] for d in drone_ids], dtype=np.int64)
+
+    def update(self, slots: np.ndarray, position: np.ndarray, velocity: np.ndarray, radius: np.ndarray,
+               kind: np.ndarray):
+        """Overwrites the state of the given rows."""
+        self._position[slots] = position
+        self._velocity[slots] = velocity
+        self._radius[slots] = radius
+        self._kind[slots] = kind
+
+    def remove(self, drone_id: str):
+        """
+        Drops a drone's row, moving the last row into it (no-op for unknown drones).
+        Returns the former index of the moved row, or None if no row moved.
+        """
+        s = self.slot.pop(drone_id, None)
+        if s is None:
+            return None
+        last = self.n - 1
+        if s == last:
+            self.drone_ids.pop()
+            self.n = last
+            return None
+        for name, _, _ in self._COLUMNS:
+            column = getattr(self, name)
+            column[s] = column[last]
+        moved = self.drone_ids.pop()
+        self.drone_ids[s] = moved
+        self.slot[moved] = s
+        self.n = last
+        return last
+
+    def clear(self):
+        self.n = 0
+        self.drone_ids = []
+        self.slot.clear()
+
+    def record(self, s: int) -> dict:
+        """State of row `s` as a telemetry state dict."""
+        p, v = self._position[s].tolist(), self._velocity[s].tolist()
+        return {
+            "id": self.drone_ids[s],
+            "x": p[0], "y": p[1], "z": p[2],
+            "vx": v[0], "vy": v[1], "vz": v[2],
+            "type": self.KINDS[self._kind[s]],
+            "uncertainty_radius": float(self._radius[s])
+        }
+
+    def records(self) -> list:
+        """Every row as a telemetry state dict, in row order (e.g. for JSON serialisation)."""
+        kinds = self.KINDS
+        return [
+            {"id": d, "x": p[0], "y": p[1], "z": p[2], "vx": v[0], "vy": v[1], "vz": v[2],
+             "type": kinds[k], "uncertainty_radius": r}
+            for d, p, v, k, r in zip(self.drone_ids, self.position.tolist(), self.velocity.tolist(),
+                                     self.kind.tolist(), self.radius.tolist())
+        ]
@@ -1,78 +1,163 @@
+import asyncio
 import collections
+import threading
 import time
 import numpy as np
+from .kalman_bank import KalmanBank
+from .state_table import StateTable
+from ..spatial.incremental_grid import IncrementalGrid
 
 class TelemetryEngine:
-    def __init__(self):
+    def __init__(self, max_batch: int = 512):
         self.rolling_buffers = collections.defaultdict(lambda: collections.deque(maxlen=40))
-        self.bogie_estimators = {}
+        # One batched constant-velocity Kalman filter bank for all bogies
+        self.bogie_filters = KalmanBank()
+        # Latest state per drone as columns, refreshed by flush() for the drones it touched
+        self.states = StateTable()
+        # Persistent broad-phase grid over the state rows, moved only when a drone changes cell.
+        # Only kept once a consumer asks for it (see track_spatial)
+        self.spatial = None
+        
+        # Ingestion queue: packets are stamped on arrival and applied in micro-batches by flush(),
+        # on the drain_loop() cadence, when max_batch packets are waiting, or before any state read
+        self.queue = collections.deque()
+        self.max_batch = max_batch
+        # Serialises flush/reset/remove_drone across threads (sync API endpoints run in a threadpool);
+        # hold it while reading the live state table. Re-entrant, as these call flush() themselves
+        self.lock = threading.RLock()
+        
+        # Called with the drone id whenever remove_drone() drops a track
+        self.on_remove = None
         
     def ingest_telemetry(self, drone_id: str, data: dict):
-        data["timestamp"] = time.time()
-        self.rolling_buffers[drone_id].append(data)
+        """Applies one packet immediately (after any queued ones, to keep per-drone order)."""
+        self.enqueue_telemetry(drone_id, data)
+        self.flush()
         
-        if data.get("type") == "bogie":
-            self.update_bogie_estimate(drone_id, data)
-            
-    def update_bogie_estimate(self, drone_id: str, data: dict):
-        if drone_id not in self.bogie_estimators:
-            self.bogie_estimators[drone_id] = {
-                "state": np.array([data["x"], data["y"], data["z"], 
-                                   data.get("vx", 0), data.get("vy", 0), data.get("vz", 0)]),
-                "covariance": np.eye(6) * 1.0,   # Start near converged steady-state (trace[:3,:3]=3 ≈ controlled radius)
-                "last_update": data["timestamp"]
-            }
-        else:
-            dt = max(0.001, data["timestamp"] - self.bogie_estimators[drone_id]["last_update"])
-            est = self.bogie_estimators[drone_id]
-            
-            # Prediction step: propagate state and covariance forward
-            F = np.eye(6)
-            F[0,3] = dt
-            F[1,4] = dt
-            F[2,5] = dt
-            
-            Q = np.eye(6) * 0.1 * dt   # Process noise
-            est["state"] = F.dot(est["state"])
-            P_pred = F.dot(est["covariance"]).dot(F.T) + Q
-            
-            # Measurement update: full Kalman correction to prevent unbounded growth
-            H = np.zeros((3, 6))        # Observation matrix (x, y, z only measured)
-            H[0,0] = H[1,1] = H[2,2] = 1.0
-            R = np.eye(3) * 2.0         # Measurement noise (2m GPS noise)
+    def enqueue_telemetry(self, drone_id: str, data: dict):
+        """Accepts a packet for the next micro-batch. Cheap enough to call from simulator callbacks."""
+        data["timestamp"] = time.time()
+        self.queue.append((drone_id, data))
+        if len(self.queue) >= self.max_batch:
+            self.flush()
             
-            S = H.dot(P_pred).dot(H.T) + R
-            K = P_pred.dot(H.T).dot(np.linalg.inv(S))  # Kalman gain
+    def flush(self) -> int:
+        """Applies every queued packet in arrival order; bogie filters are updated in one batch."""
+        with self.lock:
+            return self._flush()
             
-            meas = np.array([data["x"], data["y"], data["z"]])
-            innovation = meas - H.dot(est["state"])
-            est["state"] = est["state"] + K.dot(innovation)
-            est["covariance"] = (np.eye(6) - K.dot(H)).dot(P_pred)  # Corrected covariance
+    def _flush(self) -> int:
+        queue = self.queue
+        packets = []
+        # Drain until empty rather than a pre-counted number of pops: enqueue_telemetry() appends without the lock
+        try:
+            while True:
+                packets.append(queue.popleft())
+        except IndexError:
+            pass
+        n = len(packets)
+        if n == 0:
+            return 0
+        buffers = self.rolling_buffers
+        bogie_ids, bogie_packets = [], []
+        latest = {}
+        for drone_id, data in packets:
+            buffers[drone_id].append(data)
+            latest[drone_id] = data
+            if data.get("type") == "bogie":
+                bogie_ids.append(drone_id)
+                bogie_packets.append(data)
+        if bogie_ids:
+            self.update_bogie_estimates(bogie_ids, bogie_packets)
+        self._refresh_states(latest)
+        return n
+        
+    def _refresh_states(self, latest: dict):
+        """
+        Rewrites the state rows of the drones in `latest` ({drone_id: newest packet}): bogies from
+        their filter estimate, with the position covariance trace (capped at 30 m) as uncertainty,
+        controlled drones straight from the packet with a fixed 3 m GPS uncertainty.
+        """
+        ids = list(latest)
+        bank = self.bogie_filters
+        kind = np.array([p.get("type") == "bogie" and d in bank for d, p in latest.items()], dtype=np.int8)
+        position = np.array([(p["x"], p["y"], p["z"]) for p in latest.values()], dtype=float)
+        velocity = np.array([(p.get("vx", 0), p.get("vy", 0), 0) for p in latest.values()], dtype=float)
+        radius = np.full(len(ids), 3.0)
+        b = np.flatnonzero(kind)
+        if len(b):
+            s = np.array([bank.slot[ids[i]] for i in b.tolist()], dtype=np.int64)
+            position[b] = bank.state[s, :3]
+            velocity[b] = bank.state[s, 3:]
+            radius[b] = np.minimum(30.0, np.trace(bank.covariance[s, :3, :3], axis1=1, axis2=2))
+        slots = self.states.slots_for(ids)
+        self.states.update(slots, position, velocity, radius, kind)
+        if self.spatial is not None:
+            self.spatial.update(slots, position[:, :2], radius)
+        
+    def track_spatial(self) -> IncrementalGrid:
+        """Starts maintaining the incremental broad-phase grid (seeded with the current rows) and returns it."""
+        with self.lock:
+            if self.spatial is None:
+                self.spatial = IncrementalGrid()
+                table = self.states
+                self.spatial.update(np.arange(len(table)), table.position[:, :2], table.radius)
+            return self.spatial
+        
+    async def drain_loop(self, interval: float = 0.05):
+        """Flushes the ingestion queue on a fixed cadence."""
+        while True:
+            self.flush()
+            await asyncio.sleep(interval)
             
-            est["last_update"] = data["timestamp"]
-
+    def update_bogie_estimate(self, drone_id: str, data: dict):
+        self.update_bogie_estimates([drone_id], [data])
+        
+    def update_bogie_estimates(self, drone_ids: list, packets: list):
+        """Feeds many bogie packets (with timestamps) to the filter bank in one batched predict/update."""
+        self.bogie_filters.update(
+            drone_ids,
+            [(p["x"], p["y"], p["z"]) for p in packets],
+            [p["timestamp"] for p in packets],
+            [(p.get("vx", 0), p.get("vy", 0), p.get("vz", 0)) for p in packets]
+        )
+        
+    def reset(self):
+        """Forgets every drone: queued packets, telemetry buffers, bogie filters and latest states."""
+        with self.lock:
+            self.queue.clear()
+            self.rolling_buffers.clear()
+            self.bogie_filters.clear()
+            self.states.clear()
+            if self.spatial is not None:
+                self.spatial.clear()
+        
+    def remove_drone(self, drone_id: str):
+        """Forgets one drone (applying queued packets first); its state row is reused."""
+        with self.lock:
+            self._flush()
+            self.rolling_buffers.pop(drone_id, None)
+            self.bogie_filters.remove(drone_id)
+            s = self.states.slot.get(drone_id)
+            if s is not None:
+                moved = self.states.remove(drone_id)
+                if self.spatial is not None:
+                    self.spatial.remove(s)
+                    if moved is not None:
+                        self.spatial.move(moved, s)
+        if self.on_remove:
+            self.on_remove(drone_id)
+        
+    def state_view(self) -> StateTable:
+        """
+        Applies queued packets and returns the live state table. Its columns are live views: read them
+        while holding `lock`, or copy them, as another thread's flush may rewrite rows at any time.
+        """
+        with self.lock:
+            self._flush()
+            return self.states
             
     def get_latest_state(self):
-        states = {}
-        for d_id, buffer in self.rolling_buffers.items():
-            if not buffer:
-                continue
-            latest = buffer[-1]
-            if latest.get("type") == "bogie" and d_id in self.bogie_estimators:
-                est = self.bogie_estimators[d_id]
-                states[d_id] = {
-                    "id": d_id,
-                    "x": est["state"][0], "y": est["state"][1], "z": est["state"][2],
-                    "vx": est["state"][3], "vy": est["state"][4], "vz": est["state"][5],
-                    "type": "bogie",
-                    "uncertainty_radius": min(30.0, float(np.trace(est["covariance"][:3,:3])))
-                }
-            else:
-                states[d_id] = {
-                    "id": d_id,
-                    "x": latest["x"], "y": latest["y"], "z": latest["z"],
-                    "vx": latest.get("vx", 0), "vy": latest.get("vy", 0), "vz": 0,
-                    "type": "controlled",
-                    "uncertainty_radius": 3.0
-                }
-        return states
+        """Latest state of every drone as {drone_id: state dict}."""
+        with self.lock:
+            return {record["id"]: record for record in self.state_view().records()}
@@ -17,6 +17,9 @@ class ControlledGenerator(TelemetryGenerator):
     based on approved flight plans.
     Can be paused by the ATC. Updates consistently at 2Hz.
     """
+    # Optional hook called with the drone id when a drone reaches its final waypoint
+    on_complete: Callable[[str], None] = None
+    
     def add_controlled_drone(self, drone_id: str, waypoints: list, velocity: float):
         if len(waypoints) < 2:
             return
@@ -110,5 +113,7 @@ class ControlledGenerator(TelemetryGenerator):
             
             for d in completed_drones:
                 self.remove_drone(d)
+                if self.on_complete:
+                    self.on_complete(d)
                 
             await asyncio.sleep(0.1) # polling resolution
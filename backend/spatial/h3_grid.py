@@ -1,11 +1,14 @@
-import h3
+import h3.api.basic_int as h3
 import math
+import numpy as np
+from .uniform_grid import neighbour_pairs
 
 class RealTimeSpatialHash:
     def __init__(self, resolution: int = 10):
         # Resolution 10 is ~66m edge length, suitable for drones
         self.resolution = resolution
-        self.grid = {}
+        self.origin = None
+        self.clear()
 
     def insert_drone(self, drone_id: str, x: float, y: float, r: float):
         """
@@ -21,25 +24,50 @@ class RealTimeSpatialHash:
         
         # In real-time, also get k-ring to handle border crossings and dynamic radius
         k = math.ceil(r / 66.0) # r in meters
-        cells = h3.grid_disk(cell, k)
         
-        for c in cells:
-            if c not in self.grid:
-                self.grid[c] = []
-            self.grid[c].append(drone_id)
+        # Every drone keeps only its home cell, in local IJ coordinates around a fixed origin cell,
+        # and its k-ring size: two k-rings share a cell exactly when the hex distance between the
+        # home cells is at most k_a + k_b
+        if self.origin is None:
+            self.origin = h3.latlng_to_cell(0.0, 0.0, self.resolution)
+        slot = self.slot.get(drone_id)
+        if slot is None:
+            slot = self.slot[drone_id] = len(self.drone_ids)
+            self.drone_ids.append(drone_id)
+        self._rows.append((slot,) + tuple(h3.cell_to_local_ij(self.origin, cell)) + (k,))
+
+    def get_candidate_index_pairs(self) -> np.ndarray:
+        """
+        Slot pairs (i < j, in insertion order) of drones whose k-rings share at least one cell,
+        as a (K, 2) int64 array. Home cells are binned into square IJ buckets as wide as the largest
+        k_a + k_b, so every such pair lies in the same or adjacent buckets and neighbour_pairs() emits
+        it exactly once; the exact hex distance then filters the candidates.
+        """
+        if len(self._rows) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        rows = np.array(self._rows, dtype=np.int64)
+        slot, ij, k = rows[:, 0], rows[:, 1:3], rows[:, 3]
+        reach = max(1, 2 * int(k.max()))
+        pairs = neighbour_pairs(np.floor_divide(ij, reach))
+        a, b = pairs[:, 0], pairs[:, 1]
+        d = ij[b] - ij[a]
+        hex_distance = np.max(np.abs(np.column_stack((d, d[:, 0] - d[:, 1]))), axis=1)
+        keep = (hex_distance <= k[a] + k[b]) & (slot[a] != slot[b])
+        a, b = slot[a[keep]], slot[b[keep]]
+        pairs = np.column_stack((np.minimum(a, b), np.maximum(a, b)))
+        if len(self._rows) > len(self.drone_ids):
+            # A drone inserted at several positions can meet another one more than once
+            pairs = np.unique(pairs, axis=0)
+        return pairs
 
     def get_candidate_pairs(self):
         """
-        Returns set of drone pair tuples that are in the same grid cell.
+        Returns list of drone pair tuples (sorted ids) that are in the same grid cell.
         """
-        pairs = set()
-        for cell, drones in self.grid.items():
-            n = len(drones)
-            for i in range(n):
-                for j in range(i + 1, n):
-                    if drones[i] != drones[j]:
-                        pairs.add(tuple(sorted((drones[i], drones[j]))))
-        return list(pairs)
-        
+        ids = self.drone_ids
+        return [tuple(sorted((ids[i], ids[j]))) for i, j in self.get_candidate_index_pairs().tolist()]
+
     def clear(self):
-        self.grid = {}
+        self.drone_ids = []
+        self.slot = {}
+        self._rows = []
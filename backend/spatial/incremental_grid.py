@@ -0,0 +1,119 @@
+import numpy as np
+
+class IncrementalGrid:
+    """
+    Persistent planar broad phase over StateTable rows, updated as telemetry arrives instead of
+    being rebuilt every tick. Each row sits in the square cell of its position and has a reach
+    bucket k = ceil(2 * radius / cell_size) (at least 1); rows a and b are candidates when their
+    cells are at most max(k_a, k_b) apart along both axes, which covers every pair whose uncertainty
+    discs touch plus everything within one cell side (the UniformGrid default).
+
+    update() only records rows whose cell or reach bucket changed, marking them dirty. The candidate
+    pairs are kept as an array; candidate_index_pairs() drops the pairs of dirty rows and re-queries
+    only the dirty rows' neighbourhoods, so drones that stay inside their cell cost nothing.
+    """
+    def __init__(self, cell_size: float = 170.0, capacity: int = 64):
+        self.cell_size = cell_size
+        capacity = max(1, capacity)
+        self._cell = np.zeros((capacity, 3), dtype=np.int64)  # (cx, cy, k) per row
+        self._known = np.zeros(capacity, dtype=bool)
+        self._dirty = np.zeros(capacity, dtype=bool)
+        self.pairs = np.empty((0, 2), dtype=np.int64)       # candidate rows (a < b), valid for clean rows
+        self.last_stats = {}
+
+    def _reserve(self, rows: np.ndarray):
+        if len(rows) == 0 or rows.max() < len(self._known):
+            return
+        capacity = max(2 * len(self._known), int(rows.max()) + 1)
+        for name in ("_cell", "_known", "_dirty"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def update(self, rows: np.ndarray, xy: np.ndarray, radius: np.ndarray):
+        """Moves rows to the cells of their new (N, 2) positions and (N,) radii where these changed."""
+        rows = np.asarray(rows, dtype=np.int64)
+        self._reserve(rows)
+        cell = np.empty((len(rows), 3), dtype=np.int64)
+        cell[:, :2] = np.floor(xy / self.cell_size)
+        cell[:, 2] = np.maximum(1, np.ceil(2.0 * radius / self.cell_size))
+        changed = ~self._known[rows] | np.any(self._cell[rows] != cell, axis=1)
+        rows = rows[changed]
+        self._cell[rows] = cell[changed]
+        self._known[rows] = True
+        self._dirty[rows] = True
+
+    def remove(self, row: int):
+        """Forgets a row."""
+        if row >= len(self._known) or not self._known[row]:
+            return
+        self._known[row] = False
+        self._dirty[row] = False
+        self.pairs = self.pairs[np.all(self.pairs != row, axis=1)]
+
+    def move(self, src: int, dst: int):
+        """Relabels row `src` as `dst` (a free row), e.g. after StateTable.remove() compacted the table."""
+        if not self._known[src]:
+            return
+        self._reserve(np.array([dst]))
+        for name in ("_cell", "_known", "_dirty"):
+            column = getattr(self, name)
+            column[dst] = column[src]
+        self._known[src] = False
+        self._dirty[src] = False
+        pairs = np.where(self.pairs == src, dst, self.pairs)
+        self.pairs = np.column_stack((pairs.min(axis=1), pairs.max(axis=1)))
+
+    def clear(self):
+        self._known[:] = False
+        self._dirty[:] = False
+        self.pairs = np.empty((0, 2), dtype=np.int64)
+
+    def refresh(self):
+        """Re-derives the candidate pairs of every dirty row from its current neighbourhood."""
+        dirty = np.flatnonzero(self._dirty)
+        if len(dirty) == 0:
+            return
+        d = self._dirty
+        # 1. Pairs touching a dirty row are stale
+        self.pairs = self.pairs[~(d[self.pairs[:, 0]] | d[self.pairs[:, 1]])]
+
+        # 2. Sorted cell keys of all rows, padded so every neighbour offset stays in range
+        rows = np.flatnonzero(self._known)
+        cell = self._cell[rows]
+        reach = int(cell[:, 2].max())
+        base = cell[:, :2].min(axis=0) - reach
+        width = int(cell[:, 1].max() - base[1]) + reach + 1
+        key = (cell[:, 0] - base[0]) * width + (cell[:, 1] - base[1])
+        order = np.argsort(key, kind='stable')
+        sorted_key, sorted_rows = key[order], rows[order]
+
+        own = self._cell[dirty]
+        own_key = (own[:, 0] - base[0]) * width + (own[:, 1] - base[1])
+        k = self._cell[:, 2]
+        found = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                # 3. Rows in cell (dx, dy) away from each dirty row, as one flat cross product
+                target = own_key + dx * width + dy
+                lo = np.searchsorted(sorted_key, target, 'left')
+                count = np.searchsorted(sorted_key, target, 'right') - lo
+                total = int(count.sum())
+                if total == 0:
+                    continue
+                q = np.repeat(dirty, count)
+                other = sorted_rows[np.repeat(lo - (np.cumsum(count) - count), count) + np.arange(total)]
+                # Dirty-dirty pairs are met from both sides: keep the one seen from the lower row
+                ok = ((other != q) & (max(abs(dx), abs(dy)) <= np.maximum(k[q], k[other]))
+                      & (~d[other] | (q < other)))
+                found.append(np.column_stack((np.minimum(q[ok], other[ok]), np.maximum(q[ok], other[ok]))))
+        self.pairs = np.concatenate([self.pairs] + found)
+        self.last_stats = {"dirty_rows": len(dirty), "dirty_cells": len(np.unique(own_key)),
+                           "candidates": len(self.pairs)}
+        self._dirty[dirty] = False
+
+    def candidate_index_pairs(self) -> np.ndarray:
+        """Current candidate row pairs (i < j) as a (K, 2) int64 array, after refreshing dirty rows."""
+        self.refresh()
+        return self.pairs
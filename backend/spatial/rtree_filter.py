@@ -1,6 +1,49 @@
 from rtree import index
 import numpy as np
 
+def segment_boxes(A0: np.ndarray, A1: np.ndarray, t_start: np.ndarray, t_end: np.ndarray, pad: float,
+                  vertical_pad: float = None):
+    """
+    Vectorised 4D bounding boxes for N legs, padded by `pad` metres in x/y and `vertical_pad`
+    (default: `pad`) in z. Returns (mins, maxs) as (N, 4) arrays ordered (x, y, z, t).
+    """
+    if vertical_pad is None:
+        vertical_pad = pad
+    mins = np.empty((len(t_start), 4), dtype=float)
+    maxs = np.empty((len(t_start), 4), dtype=float)
+    np.minimum(A0, A1, out=mins[:, :3])
+    np.maximum(A0, A1, out=maxs[:, :3])
+    mins[:, :2] -= pad
+    maxs[:, :2] += pad
+    mins[:, 2] -= vertical_pad
+    maxs[:, 2] += vertical_pad
+    mins[:, 3] = t_start
+    maxs[:, 3] = t_end
+    return mins, maxs
+
+def split_boxes(A0: np.ndarray, A1: np.ndarray, t_start: np.ndarray, t_end: np.ndarray, pieces: np.ndarray,
+                pad: float, vertical_pad: float = None):
+    """
+    Like segment_boxes, but leg k is cut into pieces[k] equal time sub-intervals, each with its own
+    (tighter) box. Returns (mins, maxs, parent): boxes are grouped by leg and parent[b] is the leg of box b.
+    """
+    pieces = np.asarray(pieces, dtype=np.int64)
+    parent = np.repeat(np.arange(len(pieces)), pieces)
+    piece = np.arange(len(parent)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    f0 = (piece / pieces[parent])[:, None]
+    last = (piece == pieces[parent] - 1)[:, None]
+    f1 = np.where(last, 1.0, ((piece + 1) / pieces[parent])[:, None])
+
+    d = A1 - A0
+    P0 = A0[parent] + f0 * d[parent]
+    P1 = np.where(last, A1[parent], A0[parent] + f1 * d[parent])
+    dt = (t_end - t_start)[parent]
+    T0 = t_start[parent] + f0[:, 0] * dt
+    T1 = np.where(last[:, 0], t_end[parent], t_start[parent] + f1[:, 0] * dt)
+    mins, maxs = segment_boxes(P0, P1, T0, T1, pad, vertical_pad)
+    return mins, maxs, parent
+
+
 class SpatialTemporalIndex:
     def __init__(self, safety_radius: float):
         p = index.Property()
@@ -10,6 +53,141 @@ class SpatialTemporalIndex:
         self.segment_map = {}
         self.counter = 0
 
+        # Box columns, only populated by the bulk-load constructors
+        self.mins = None
+        self.maxs = None
+        self.drone_idx = None
+
+        # Optional box -> leg map for legs split into several boxes (None: box id == leg id)
+        self.parent = None
+        self.first_box = None
+        self.last_stats = {}
+
+    @classmethod
+    def from_boxes(cls, mins: np.ndarray, maxs: np.ndarray, drone_idx: np.ndarray, safety_radius: float = 0.0,
+                   parent: np.ndarray = None):
+        """
+        Bulk-loads (STR-packed) an index from N precomputed 4D boxes in one call.
+        Box k gets id k; `drone_idx[k]` is its owner, used to drop same-drone pairs.
+        With `parent` (sorted box -> leg ids, see split_boxes) joins and queries report leg ids instead.
+        """
+        self = cls(safety_radius)
+        self.mins = np.ascontiguousarray(mins, dtype=float)
+        self.maxs = np.ascontiguousarray(maxs, dtype=float)
+        self.drone_idx = np.asarray(drone_idx)
+        self.counter = len(self.mins)
+        if parent is not None:
+            self.parent = np.asarray(parent, dtype=np.int64)
+            n_legs = int(self.parent[-1]) + 1 if len(self.parent) else 0
+            self.first_box = np.searchsorted(self.parent, np.arange(n_legs + 1))
+        if self.counter:
+            p = index.Property()
+            p.dimension = 4
+            self.idx = index.Index((np.arange(self.counter, dtype=np.int64), self.mins, self.maxs), properties=p)
+        return self
+
+    @classmethod
+    def from_table(cls, table, safety_radius: float, vertical_safety_radius: float = None, pieces: np.ndarray = None):
+        """
+        Bulk-loads the index over every leg of a SegmentTable (leg id == table row).
+        Boxes are padded by half of each separation, so two boxes overlap exactly when the legs'
+        extents come within `safety_radius` horizontally and `vertical_safety_radius` vertically.
+        `pieces` optionally splits each leg into that many time sub-interval boxes.
+        """
+        if vertical_safety_radius is None:
+            vertical_safety_radius = safety_radius
+        if pieces is None:
+            mins, maxs = segment_boxes(table.A0, table.A1, table.t_start, table.t_end,
+                                       safety_radius / 2, vertical_safety_radius / 2)
+            return cls.from_boxes(mins, maxs, table.drone_idx, safety_radius)
+        mins, maxs, parent = split_boxes(table.A0, table.A1, table.t_start, table.t_end, pieces,
+                                         safety_radius / 2, vertical_safety_radius / 2)
+        return cls.from_boxes(mins, maxs, table.drone_idx[parent], safety_radius, parent)
+
+    @property
+    def n_legs(self) -> int:
+        return self.counter if self.parent is None else len(self.first_box) - 1
+
+    def row_boxes(self, rows: slice) -> np.ndarray:
+        """Box ids of a contiguous range of legs."""
+        if self.parent is None:
+            return np.arange(rows.start, rows.stop)
+        return np.arange(self.first_box[rows.start], self.first_box[rows.stop])
+
+    def row_pieces(self, rows: slice) -> np.ndarray:
+        """Number of boxes of each leg in a contiguous range."""
+        if self.parent is None:
+            return np.ones(rows.stop - rows.start, dtype=np.int64)
+        return np.diff(self.first_box[rows.start:rows.stop + 1])
+
+    def _unique_leg_pairs(self, a: np.ndarray, b: np.ndarray):
+        """Deduplicates (a, b) leg-id pairs that several box pairs mapped to; result is sorted."""
+        key = np.unique(a * self.n_legs + b)
+        return key // self.n_legs, key % self.n_legs
+
+    def self_join(self, query_rows: np.ndarray = None) -> np.ndarray:
+        """
+        All-pairs join of a bulk-loaded index against itself, as one vectorised query.
+        Returns a (K, 2) int64 array of leg-id pairs (i < j, sorted) with same-drone pairs removed.
+        With `query_rows` only box pairs involving at least one of those box ids are joined.
+        Counts are kept in `last_stats` to monitor broad-phase pruning.
+        """
+        if not self.counter:
+            self.last_stats = {"boxes": 0, "box_pairs": 0, "candidates": 0}
+            return np.empty((0, 2), dtype=np.int64)
+        if query_rows is None:
+            query_rows = np.arange(self.counter, dtype=np.int64)
+        ids, counts = self.idx.intersection_v(self.mins[query_rows], self.maxs[query_rows])
+        ids = ids.astype(np.int64)
+        query = np.repeat(query_rows, counts.astype(np.int64))
+        # Pairs of two query boxes are met from both sides: keep the one seen from the lower box
+        queried = np.zeros(self.counter, dtype=bool)
+        queried[query_rows] = True
+        keep = ((query < ids) | ~queried[ids]) & (self.drone_idx[query] != self.drone_idx[ids])
+        query, ids = query[keep], ids[keep]
+        if self.parent is None:
+            pairs = np.column_stack((query, ids))
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        else:
+            a, b = self.parent[query], self.parent[ids]
+            pairs = np.column_stack(self._unique_leg_pairs(np.minimum(a, b), np.maximum(a, b)))
+        self.last_stats = {"boxes": self.counter, "box_pairs": len(query), "candidates": len(pairs)}
+        return pairs
+
+    def query_boxes(self, mins: np.ndarray, maxs: np.ndarray):
+        """
+        Probes the index with M external boxes in one vectorised query.
+        Returns (query, ids): flat int64 arrays where box query[k] intersects indexed leg ids[k].
+        """
+        if not self.counter or len(mins) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        ids, counts = self.idx.intersection_v(np.ascontiguousarray(mins, dtype=float),
+                                              np.ascontiguousarray(maxs, dtype=float))
+        query = np.repeat(np.arange(len(mins), dtype=np.int64), counts.astype(np.int64))
+        if self.parent is None:
+            return query, ids.astype(np.int64)
+        return self._unique_leg_pairs(query, self.parent[ids.astype(np.int64)])
+
+    def update_boxes(self, ids: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        """Moves existing bulk-loaded boxes to new bounds in place (delete + re-insert per id)."""
+        for i, lo, hi in zip(ids.tolist(), mins, maxs):
+            self.idx.delete(i, tuple(self.mins[i]) + tuple(self.maxs[i]))
+            self.idx.insert(i, tuple(lo) + tuple(hi))
+            self.mins[i] = lo
+            self.maxs[i] = hi
+
+    def insert_boxes(self, ids: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        """Adds boxes under caller-chosen ids to a dynamically maintained index."""
+        for i, lo, hi in zip(ids.tolist(), mins.tolist(), maxs.tolist()):
+            self.idx.insert(i, tuple(lo + hi))
+        self.counter += len(ids)
+
+    def delete_boxes(self, ids: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        """Removes boxes added by insert_boxes(); the R-tree needs their exact bounds to find them."""
+        for i, lo, hi in zip(ids.tolist(), mins.tolist(), maxs.tolist()):
+            self.idx.delete(i, tuple(lo + hi))
+        self.counter -= len(ids)
+
     def insert_segment(self, segment: dict):
         A0 = segment["A0"]
         A1 = segment["A1"]
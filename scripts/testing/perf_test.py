@@ -43,31 +43,36 @@ def spawn_bogies(n: int):
     return r.status_code == 200
 
 def spawn_controlled(n: int):
-    """Propose N controlled drones to the ATC queue."""
-    for i in range(n):
-        plan = {
-            "waypoints": [
-                {"x": random.uniform(-500, 500), "y": random.uniform(-500, 500), "z": 50},
-                {"x": random.uniform(-2000, 2000), "y": random.uniform(-2000, 2000), "z": random.uniform(50, 200)},
-                {"x": random.uniform(-3000, 3000), "y": random.uniform(-3000, 3000), "z": random.uniform(50, 200)},
-            ],
-            "velocity": random.uniform(8, 20)
+    """Propose N controlled drones to the ATC queue in one batch (conflicting plans get delayed)."""
+    plans = [
+        {
+            "drone_id": f"C_perf_{i:03d}",
+            "plan": {
+                "waypoints": [
+                    {"x": random.uniform(-500, 500), "y": random.uniform(-500, 500), "z": 50},
+                    {"x": random.uniform(-2000, 2000), "y": random.uniform(-2000, 2000), "z": random.uniform(50, 200)},
+                    {"x": random.uniform(-3000, 3000), "y": random.uniform(-3000, 3000), "z": random.uniform(50, 200)},
+                ],
+                "velocity": random.uniform(8, 20)
+            }
         }
-        try:
-            requests.post(f"{BASE_URL}/api/mode3/propose",
-                         json={"drone_id": f"C_perf_{i:03d}", "plan": plan},
-                         timeout=5)
-        except Exception:
-            pass
-
-def time_conflict_checker_in_process(n_drones: int, n_samples: int = 20) -> dict:
+        for i in range(n)
+    ]
+    try:
+        requests.post(f"{BASE_URL}/api/mode3/propose_batch",
+                     json={"plans": plans, "auto_delay": True},
+                     timeout=30)
+    except Exception:
+        pass
+
+def time_conflict_checker_in_process(n_drones: int, n_samples: int = 20, broad_phase: str = "h3") -> dict:
     """
     Builds a synthetic TelemetryEngine + RealTimeATC in-process
     with n_drones active states, then times monitor_airspace() N times.
     This isolates ONLY the conflict-check cost, not network/WS overhead.
     """
     te = TelemetryEngine()
-    atc = RealTimeATC(te)
+    atc = RealTimeATC(te, broad_phase=broad_phase)
 
     # Inject synthetic telemetry for n_drones
     for i in range(n_drones):
@@ -150,14 +155,15 @@ if __name__ == "__main__":
 
     # In-process conflict checker benchmark at different scales
     print("\n[2] Timing conflict-checker (in-process, isolated from network):")
-    print(f"\n{'Drones':>8}  {'Min ms':>8}  {'Avg ms':>8}  {'Max ms':>8}  {'Conflicts':>10}")
-    print("-" * 50)
-
     results = []
-    for n in [10, 20, 30, 50, 75, 100, 150, 200, 300, 500]:
-        r = time_conflict_checker_in_process(n, n_samples=30)
-        results.append(r)
-        print(f"{n:>8}  {r['min_ms']:>8}  {r['avg_ms']:>8}  {r['max_ms']:>8}  {r['conflicts_found']:>10}")
+    for broad_phase in RealTimeATC.BROAD_PHASES:
+        print(f"\n  broad phase: {broad_phase}")
+        print(f"{'Drones':>8}  {'Min ms':>8}  {'Avg ms':>8}  {'Max ms':>8}  {'Conflicts':>10}")
+        print("-" * 50)
+        for n in [10, 20, 30, 50, 75, 100, 150, 200, 300, 500]:
+            r = time_conflict_checker_in_process(n, n_samples=30, broad_phase=broad_phase)
+            results.append(r)
+            print(f"{n:>8}  {r['min_ms']:>8}  {r['avg_ms']:>8}  {r['max_ms']:>8}  {r['conflicts_found']:>10}")
 
     print("\n[DONE] Copy these numbers into the README performance table.")
     print("Note: UI FPS must be measured separately via browser DevTools.\n")
@@ -0,0 +1,45 @@
+import sys
+sys.path.append('.')
+
+import random
+from backend.core_math.offline_checker import OfflineBatchChecker
+from backend.core_math.conflict_cache import ConflictCache
+
+def mission(n, rnd, span=400):
+    data = {}
+    for i in range(n):
+        wps = [{"x": rnd.uniform(0, span), "y": rnd.uniform(0, span), "z": rnd.uniform(30, 90)} for _ in range(4)]
+        data[f"D{i:03d}"] = {"waypoints": wps, "start_time": rnd.uniform(0, 30), "velocity": rnd.uniform(5, 15)}
+    return data
+
+def check(data, cache=None):
+    checker = OfflineBatchChecker(safety_radius=35.0, cache=cache)
+    checker.parse_mission_data(data)
+    return checker.detect_conflicts()
+
+def test_resubmission_keeps_snapshots_bounded():
+    rnd = random.Random(7)
+    data = mission(60, rnd)
+    cache = ConflictCache(max_snapshots=8)
+    for round_ in range(200):
+        # Re-plan a few drones, or submit only part of the fleet, as repeated Mode 1 requests do
+        for drone_id in rnd.sample(sorted(data), 3):
+            data[drone_id] = mission(1, rnd)["D000"]
+        request = data if round_ % 3 else dict(rnd.sample(sorted(data.items()), 40))
+        assert check(request, cache) == check(request)
+        assert len(cache._snapshots) <= cache.max_snapshots
+        assert len(cache) <= 60 + 3 * cache.max_snapshots
+    print("Snapshots after 200 resubmissions:", len(cache._snapshots), "| cached drones:", len(cache))
+
+def test_superseded_snapshots_are_dropped():
+    data = mission(30, random.Random(3))
+    cache = ConflictCache()
+    for _ in range(50):
+        check(data, cache)
+    # Every resubmission covers the same drones, so only the newest snapshot survives
+    assert len(cache._snapshots) == 1
+    print("Snapshots after 50 identical resubmissions:", len(cache._snapshots))
+
+if __name__ == "__main__":
+    test_resubmission_keeps_snapshots_bounded()
+    test_superseded_snapshots_are_dropped()
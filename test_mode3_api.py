@@ -0,0 +1,33 @@
+import sys
+sys.path.append('.')
+
+import asyncio
+import pytest
+
+pytest.importorskip("fastapi")
+from backend.api import main
+
+async def fly(seconds):
+    loop = asyncio.create_task(main.controlled_sim.simulate_loop())
+    await asyncio.sleep(seconds)
+    loop.cancel()
+
+def test_completed_flight_leaves_state_view():
+    plan = {"waypoints": [{"x": 0, "y": 0, "z": 0}, {"x": 0, "y": 0, "z": 4}, {"x": 3, "y": 0, "z": 4}], "velocity": 10}
+    assert main.propose_flight({"drone_id": "Controlled_T1", "plan": plan})["status"] == "APPROVED"
+    assert main.launch_flight("Controlled_T1") == {"status": "success"}
+
+    # 1. In flight: the drone reports telemetry and shows up in the live state table
+    asyncio.run(fly(0.7))
+    assert "Controlled_T1" in main.telemetry_engine.state_view().slot
+    assert "Controlled_T1" in main.get_mode3_status()["launched"]
+
+    # 2. Past its final waypoint: the flight is retired and its track dropped
+    asyncio.run(fly(1.5))
+    assert "Controlled_T1" not in main.telemetry_engine.state_view().slot
+    assert "Controlled_T1" not in main.get_mode3_status()["launched"]
+    assert "Controlled_T1" not in main.atc_manager.intents
+    print("Controlled_T1 left the state table after landing")
+
+if __name__ == "__main__":
+    test_completed_flight_leaves_state_view()